@@ -1,3 +1,5 @@
+import os
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,6 +8,7 @@ from app.api.transcribe import router as transcribe_router
 from app.api.download import router as download_router
 from app.api.progress_ws import router as websocket_router
 from app.api.upload_legacy import router as upload_legacy_router
+from app.core.config import settings
 from app.core.logging import setup_logging
 
 
@@ -22,6 +25,9 @@ def create_app() -> FastAPI:
     # Setup logging
     setup_logging()
 
+    # Job directories are created inside this with mkdtemp
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -43,6 +49,3 @@ def create_app() -> FastAPI:
 
     return app
 
-
-# Create the FastAPI application instance
-app = create_app()
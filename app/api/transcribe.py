@@ -4,8 +4,9 @@ Transcription API routes.
 This module handles the routes for transcribing YouTube videos.
 """
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from typing import Dict, Any, Optional
+import asyncio
 import uuid
 import os
 import tempfile
@@ -14,6 +15,9 @@ import logging
 from app.models.request import TranscriptionRequest
 from app.models.response import TranscriptionResponse
 from app.services.cache_service import CacheService, get_cache_service
+from app.services.job_store import JobStatusStore
+from app.utils.file_manager import save_transcription_formats
+from app.utils.youtube import extract_video_id
 from app.services import whisper_service
 from app.api.progress_ws import broadcast_status_update
 from app.core.config import settings
@@ -21,8 +25,11 @@ from app.core.config import settings
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Dictionary to store job statuses in memory (in production, use a database)
-job_statuses = {}
+# Job statuses in memory (in production, use a database), bounded by size and age
+job_statuses = JobStatusStore(settings.JOB_STATUS_MAX_ENTRIES, settings.JOB_STATUS_TTL)
+
+# Jobs still in progress by cache key, so identical concurrent requests share one job
+pending_jobs: Dict[str, str] = {}
 
 
 @router.get("/config")
@@ -50,11 +57,9 @@ async def transcribe_video(
     - **lang**: ISO639-1 language code (default: en)
     """
     # Extract video ID from URL
-    video_id = (
-        request.url.split("v=")[-1].split("&")[0]
-        if "v=" in request.url
-        else request.url.split("youtu.be/")[-1].split("?")[0]
-    )
+    video_id = extract_video_id(request.url)
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
     logger.info(
         f"Received transcription request for video {video_id} with mode {request.mode} and lang {request.lang}"
     )
@@ -63,19 +68,8 @@ async def transcribe_video(
     cache_key = f"transcription:{video_id}:{request.mode}:{request.lang}"
 
     # Check if result is cached
-    cached_result = await cache_service.get(cache_key)
-    if cached_result:
-        logger.info(f"Cache hit for video {video_id}")
-        # Create a job ID for the cached result
-        job_id = str(uuid.uuid4())
-
-        # Store job status as complete
-        job_statuses[job_id] = {
-            "status": "complete",
-            "percent": 100,
-            "video_id": video_id,
-        }
-
+    job_id = await create_job_from_cache(cache_service, cache_key, video_id)
+    if job_id:
         # Return response with download links
         return TranscriptionResponse(
             job_id=job_id,
@@ -90,17 +84,7 @@ async def transcribe_video(
             error="Error",
         )
 
-    # Generate job ID
-    job_id = str(uuid.uuid4())
-
-    # Store initial job status
-    job_statuses[job_id] = {"status": "queued", "percent": 0, "video_id": video_id}
-
-    # Process the transcription in the background
-    background_tasks.add_task(
-        process_transcription, job_id, request, video_id, cache_key
-    )
-    logger.info(f"Started background task for job {job_id} for video {video_id}")
+    job_id = start_transcription_job(background_tasks, request, video_id, cache_key)
     # Return response with job ID
     return TranscriptionResponse(
         job_id=job_id,
@@ -116,13 +100,97 @@ async def transcribe_video(
     )
 
 
+def start_transcription_job(
+    background_tasks: BackgroundTasks,
+    request: TranscriptionRequest,
+    video_id: str,
+    cache_key: str,
+) -> str:
+    """
+    Queue a transcription job, or reuse one already running for the same request.
+
+    Args:
+        background_tasks: Background tasks of the current request
+        request: Transcription request parameters
+        video_id: YouTube video ID
+        cache_key: Key for caching the result
+
+    Returns:
+        ID of the new or already running job
+    """
+    job_id = pending_jobs.get(cache_key)
+    if job_id and job_id in job_statuses:
+        logger.info(f"Reusing in-progress job {job_id} for video {video_id}")
+        return job_id
+
+    # Generate job ID
+    job_id = str(uuid.uuid4())
+    pending_jobs[cache_key] = job_id
+
+    # Store initial job status
+    job_statuses[job_id] = {"status": "queued", "percent": 0, "video_id": video_id}
+
+    # Process the transcription in the background
+    background_tasks.add_task(
+        process_transcription, job_id, request, video_id, cache_key
+    )
+    logger.info(f"Started background task for job {job_id} for video {video_id}")
+    return job_id
+
+
+async def create_job_from_cache(
+    cache_service: CacheService, cache_key: str, video_id: str
+) -> Optional[str]:
+    """
+    Create a completed job from a cached transcription, if there is one.
+
+    Args:
+        cache_service: Cache service to look the result up in
+        cache_key: Key for the cached result
+        video_id: YouTube video ID
+
+    Returns:
+        ID of the new completed job, or None on a cache miss
+    """
+    # The cache holds file paths; the files may have been cleaned up since
+    cached_result = await cache_service.get(cache_key)
+    cached_files = cached_result.get("files") if cached_result else None
+    if not cached_files or not all(os.path.exists(path) for path in cached_files.values()):
+        return None
+
+    logger.info(f"Cache hit for video {video_id}")
+    # Create a job ID for the cached result
+    job_id = str(uuid.uuid4())
+
+    # Store job status as complete, pointing at the cached files
+    job_statuses[job_id] = {
+        "status": "complete",
+        "percent": 100,
+        "video_id": video_id,
+        "files": cached_files,
+    }
+    return job_id
+
+
 @router.get("/job/{job_id}/status", response_model=Dict[str, Any])
-async def get_job_status(job_id: str):
-    """Get the status of a transcription job."""
+async def get_job_status(job_id: str, request: Request, response: Response):
+    """
+    Get the status of a transcription job.
+
+    The response carries an ETag so pollers can send If-None-Match and get
+    an empty 304 while the job has not moved on.
+    """
     if job_id not in job_statuses:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return job_statuses[job_id]
+    status = job_statuses[job_id]
+    # Workers only add keys or change status/percent, so these identify the state
+    etag = f'"{status.get("status")}-{status.get("percent")}-{len(status)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return status
 
 
 async def process_transcription(
@@ -138,14 +206,18 @@ async def process_transcription(
         cache_key: Key for caching the result
     """
     try:
+        job = job_statuses.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was evicted or never registered, skipping it")
+            return
         transcription = None
 
         # Try captions first if mode is 'auto' or 'captions'
         if request.mode in ["auto", "captions"]:
             logger.info(f"Attempting to extract captions for video {video_id}")
-            job_statuses[job_id]["status"] = "extracting_captions"
-            job_statuses[job_id]["percent"] = 20
-            await broadcast_status_update(job_id, job_statuses[job_id])
+            job["status"] = "extracting_captions"
+            job["percent"] = 20
+            await broadcast_status_update(job_id, job)
 
             try:
                 # Try to get captions from YouTube
@@ -161,9 +233,9 @@ async def process_transcription(
                     transcription = captions
 
                     # Update status to processing
-                    job_statuses[job_id]["status"] = "processing_captions"
-                    job_statuses[job_id]["percent"] = 70
-                    await broadcast_status_update(job_id, job_statuses[job_id])
+                    job["status"] = "processing_captions"
+                    job["percent"] = 70
+                    await broadcast_status_update(job_id, job)
                 else:
                     logger.info(f"No captions found for video {video_id}")
 
@@ -179,15 +251,18 @@ async def process_transcription(
             logger.info(f"Attempting Whisper transcription for video {video_id}")
 
             # Update status to downloading
-            job_statuses[job_id]["status"] = "downloading_audio"
-            job_statuses[job_id]["percent"] = 30
-            await broadcast_status_update(job_id, job_statuses[job_id])
+            job["status"] = "downloading_audio"
+            job["percent"] = 30
+            await broadcast_status_update(job_id, job)
+
+            # Download and transcription block, so run them off the event loop
+            loop = asyncio.get_running_loop()
 
             # Create a temporary directory for processing
-            with tempfile.TemporaryDirectory() as temp_dir:
+            with tempfile.TemporaryDirectory(dir=settings.SCRATCH_DIR) as temp_dir:
                 # Download audio
-                audio_path = whisper_service.download_audio_from_youtube(
-                    request.url, temp_dir
+                audio_path = await loop.run_in_executor(
+                    None, whisper_service.download_audio_from_youtube, request.url, temp_dir
                 )
                 if not audio_path:
                     if request.mode == "whisper":
@@ -200,13 +275,13 @@ async def process_transcription(
                         )
 
                 # Update status to transcribing
-                job_statuses[job_id]["status"] = "transcribing_audio"
-                job_statuses[job_id]["percent"] = 70
-                await broadcast_status_update(job_id, job_statuses[job_id])
+                job["status"] = "transcribing_audio"
+                job["percent"] = 70
+                await broadcast_status_update(job_id, job)
 
                 # Transcribe audio
-                transcription = whisper_service.transcribe_audio_file(
-                    audio_path, request.lang
+                transcription = await loop.run_in_executor(
+                    None, whisper_service.transcribe_audio_file, audio_path, request.lang
                 )
                 if not transcription:
                     raise Exception("Failed to transcribe audio with Whisper")
@@ -217,22 +292,23 @@ async def process_transcription(
             raise Exception("Could not transcribe video using any available method")
 
         # Save transcription files
-        job_statuses[job_id]["status"] = "saving_files"
-        job_statuses[job_id]["percent"] = 90
-        await broadcast_status_update(job_id, job_statuses[job_id])
+        job["status"] = "saving_files"
+        job["percent"] = 90
+        await broadcast_status_update(job_id, job)
 
-        files = await save_transcription_files(job_id, transcription)
+        # mkdtemp creates a fresh, uniquely named directory in one call
+        job_dir = tempfile.mkdtemp(prefix=f"{job_id}_", dir=settings.TEMP_DIR)
+        job["job_dir"] = job_dir
+        files = await save_transcription_files(job_dir, transcription)
 
         # Update status to complete
-        job_statuses[job_id]["status"] = "complete"
-        job_statuses[job_id]["percent"] = 100
-        job_statuses[job_id]["files"] = files
-        await broadcast_status_update(job_id, job_statuses[job_id])
-
-        # Cache the result
-        await get_cache_service().set(
-            cache_key, {"files": files, "transcription": transcription}
-        )
+        job["status"] = "complete"
+        job["percent"] = 100
+        job["files"] = files
+        await broadcast_status_update(job_id, job)
+
+        # Cache only the file paths; the transcription text already lives on disk
+        await get_cache_service().set(cache_key, {"files": files})
 
         logger.info(f"Transcription completed successfully for video {video_id}")
         logger.info(f"Files saved: {files}")
@@ -240,47 +316,25 @@ async def process_transcription(
     except Exception as e:
         logger.error(f"Error processing transcription: {e}")
         # Update status to error
-        job_statuses[job_id]["status"] = "error"
-        job_statuses[job_id]["error"] = str(e)
-        job_statuses[job_id]["percent"] = 0
-        await broadcast_status_update(job_id, job_statuses[job_id])
+        job["status"] = "error"
+        job["error"] = str(e)
+        job["percent"] = 0
+        await broadcast_status_update(job_id, job)
+    finally:
+        # Later requests hit the cache or start a fresh job
+        if pending_jobs.get(cache_key) == job_id:
+            del pending_jobs[cache_key]
 
 
-async def save_transcription_files(job_id: str, transcription):
+async def save_transcription_files(job_dir: str, transcription):
     """
     Save transcription to temporary files in different formats.
 
     Args:
-        job_id: Unique job identifier
+        job_dir: Existing directory to write the files into
         transcription: Transcription data with text, srt, and vtt formats
 
     Returns:
         Dictionary with file paths for different formats
     """
-    # Create directory for files
-    os.makedirs("tmp", exist_ok=True)
-    job_dir = os.path.join("tmp", job_id)
-    os.makedirs(job_dir, exist_ok=True)
-
-    # Save files in different formats
-    files = {}
-
-    # Plain text
-    txt_path = os.path.join(job_dir, "transcription.txt")
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(transcription["text"])
-    files["txt"] = txt_path
-
-    # SRT format
-    srt_path = os.path.join(job_dir, "transcription.srt")
-    with open(srt_path, "w", encoding="utf-8") as f:
-        f.write(transcription["srt"])
-    files["srt"] = srt_path
-
-    # VTT format
-    vtt_path = os.path.join(job_dir, "transcription.vtt")
-    with open(vtt_path, "w", encoding="utf-8") as f:
-        f.write(transcription["vtt"])
-    files["vtt"] = vtt_path
-
-    return files
+    return save_transcription_formats(job_dir, "transcription", transcription)
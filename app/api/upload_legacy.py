@@ -3,26 +3,30 @@ Legacy API routes for compatibility with the static frontend.
 These routes match the simple_server Flask API (no /api prefix).
 """
 import os
-import re
-import time
+import shutil
 import uuid
 import tempfile
 import logging
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
-from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
 
 from app.models.request import TranscriptionRequest
 from app.services import whisper_service
-from app.api.transcribe import job_statuses, process_transcription
-from app.core.config import settings_helper
+from app.services.cache_service import CacheService, get_cache_service
+from app.api.transcribe import create_job_from_cache, job_statuses, start_transcription_job
+from app.core.config import settings, settings_helper
+from app.utils.file_manager import UNSAFE_FILENAME_CHARS_RE, save_transcription_formats
+from app.utils.youtube import extract_video_id
 
 MAX_FILE_SIZE = settings_helper.get_max_file_size_bytes()
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=4)
+executor = ThreadPoolExecutor(
+    max_workers=settings.MAX_CONCURRENT_JOBS, thread_name_prefix="transcribe"
+)
 
 ALLOWED_EXTENSIONS = {
     '.mp3', '.mp4', '.wav', '.m4a', '.flac', '.aac', '.ogg',
@@ -33,14 +37,18 @@ ALLOWED_EXTENSIONS = {
 def _transcribe_file_task(job_id: str, file_path: str, language: str, custom_name: str, original_filename: str):
     """Background task to transcribe an uploaded file."""
     try:
-        job_statuses[job_id]["status"] = "processing_file"
-        job_statuses[job_id]["percent"] = 10
+        job = job_statuses.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was evicted or never registered, skipping it")
+            return
+        job["status"] = "processing_file"
+        job["percent"] = 10
 
         save_dir = os.path.join("tmp", job_id)
         os.makedirs(save_dir, exist_ok=True)
 
-        job_statuses[job_id]["percent"] = 30
-        job_statuses[job_id]["status"] = "transcribing_file"
+        job["percent"] = 30
+        job["status"] = "transcribing_file"
 
         transcription_result = whisper_service.transcribe_audio_file(
             file_path,
@@ -50,66 +58,56 @@ def _transcribe_file_task(job_id: str, file_path: str, language: str, custom_nam
         if not transcription_result:
             raise Exception("Failed to transcribe the uploaded file.")
 
-        job_statuses[job_id]["percent"] = 80
-        job_statuses[job_id]["status"] = "saving_results"
+        job["percent"] = 80
+        job["status"] = "saving_results"
 
         base_name = custom_name or Path(original_filename).stem
-        base_name = re.sub(r'[<>:"/\\|?*]', '_', base_name).strip()
+        base_name = UNSAFE_FILENAME_CHARS_RE.sub('_', base_name).strip()
 
-        txt_path = os.path.join(save_dir, f"{base_name}.txt")
-        srt_path = os.path.join(save_dir, f"{base_name}.srt")
-        vtt_path = os.path.join(save_dir, f"{base_name}.vtt")
+        files = save_transcription_formats(save_dir, base_name, transcription_result)
 
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(transcription_result["text"])
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(transcription_result["srt"])
-        with open(vtt_path, "w", encoding="utf-8") as f:
-            f.write(transcription_result["vtt"])
-
-        job_statuses[job_id]["status"] = "complete"
-        job_statuses[job_id]["percent"] = 100
-        job_statuses[job_id]["files"] = {"txt": txt_path, "srt": srt_path, "vtt": vtt_path}
-        job_statuses[job_id]["transcription_file"] = base_name
-
-        try:
-            os.remove(file_path)
-        except OSError:
-            pass
+        job["status"] = "complete"
+        job["percent"] = 100
+        job["files"] = files
+        job["transcription_file"] = base_name
 
         logger.info(f"Completed file transcription for job {job_id}")
     except Exception as e:
         logger.error(f"Error in file transcription job {job_id}: {e}")
-        job_statuses[job_id]["status"] = "error"
-        job_statuses[job_id]["error"] = str(e)
-        job_statuses[job_id]["percent"] = 100
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except OSError:
-            pass
+        job["status"] = "error"
+        job["error"] = str(e)
+        job["percent"] = 100
+    finally:
+        # Remove the upload and its scratch directory
+        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
 
 
 @router.post("/transcribe")
-async def transcribe(background_tasks: BackgroundTasks, request: TranscriptionRequest):
+async def transcribe(
+    background_tasks: BackgroundTasks,
+    request: TranscriptionRequest,
+    cache_service: CacheService = Depends(get_cache_service),
+):
     """Transcribe YouTube video (legacy endpoint for static frontend)."""
-    video_id = request.url.split("v=")[-1].split("&")[0] if "v=" in request.url else request.url.split("youtu.be/")[-1].split("?")[0]
-    job_id = str(uuid.uuid4())
-
-    job_statuses[job_id] = {
-        "status": "queued",
-        "percent": 0,
-        "video_id": video_id,
-    }
+    video_id = extract_video_id(request.url)
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
     cache_key = f"transcription:{video_id}:{request.mode}:{request.lang}"
-    background_tasks.add_task(process_transcription, job_id, request, video_id, cache_key)
+    job_id = await create_job_from_cache(cache_service, cache_key, video_id)
+    if job_id:
+        status = "complete"
+        message = "Transcription retrieved from cache"
+    else:
+        job_id = start_transcription_job(background_tasks, request, video_id, cache_key)
+        status = "queued"
+        message = "Transcription job started"
 
     return JSONResponse({
         "job_id": job_id,
-        "status": "queued",
+        "status": status,
         "video_id": video_id,
-        "message": "Transcription job started",
+        "message": message,
         "download_links": {
             "txt": f"/download/{job_id}?format=txt",
             "srt": f"/download/{job_id}?format=srt",
@@ -137,7 +135,7 @@ async def upload_transcribe(
     if file_size > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail="File too large. Maximum size is 200MB.")
 
-    job_id = f"file_{int(time.time())}_{uuid.uuid4().hex[:4]}"
+    job_id = f"file_{uuid.uuid4().hex[:12]}"
     video_id = custom_name or os.path.splitext(file.filename)[0]
 
     job_statuses[job_id] = {
@@ -150,8 +148,7 @@ async def upload_transcribe(
         "file_size": file_size,
     }
 
-    os.makedirs("tmp", exist_ok=True)
-    temp_dir = tempfile.mkdtemp(dir="tmp")
+    temp_dir = tempfile.mkdtemp(prefix="videotranscribe_api_", dir=settings.SCRATCH_DIR)
     temp_file_path = os.path.join(temp_dir, f"upload{file_ext}")
     with open(temp_file_path, "wb") as f:
         f.write(content)
@@ -201,22 +198,25 @@ async def download(job_id: str, format: str = "txt"):
     if job_id not in job_statuses:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job_dir = os.path.join("tmp", job_id)
-    if not os.path.exists(job_dir):
-        raise HTTPException(status_code=404, detail="Files not found")
-
     status = job_statuses[job_id]
     if status.get("status") != "complete":
         raise HTTPException(status_code=202, detail=f"Transcription not ready. Status: {status.get('status')}")
 
-    files = [f for f in os.listdir(job_dir) if f.endswith(f".{format}")]
-    if not files:
-        raise HTTPException(status_code=404, detail=f"No {format} file found")
+    # Jobs served from the cache point at another job's files
+    file_path = status.get("files", {}).get(format)
+    if not file_path:
+        job_dir = status.get("job_dir") or os.path.join("tmp", job_id)
+        if not os.path.exists(job_dir):
+            raise HTTPException(status_code=404, detail="Files not found")
+
+        files = [f for f in os.listdir(job_dir) if f.endswith(f".{format}")]
+        if not files:
+            raise HTTPException(status_code=404, detail=f"No {format} file found")
+        file_path = os.path.join(job_dir, files[0])
 
-    file_path = os.path.join(job_dir, files[0])
     content_types = {"txt": "text/plain", "srt": "application/x-subrip", "vtt": "text/vtt"}
     return FileResponse(
         file_path,
         media_type=content_types.get(format, "text/plain"),
-        filename=files[0],
+        filename=os.path.basename(file_path),
     )
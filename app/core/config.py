@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "YouTube Transcription API"
+    DEBUG: bool = False  # Enables auto-reload when running main.py directly
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
@@ -27,6 +28,7 @@ class Settings(BaseSettings):
     CACHE_TYPE: str = "memory"  # memory or redis
     REDIS_URL: Optional[str] = "redis://localhost:6379/0"
     CACHE_TTL: int = 86400  # 24 hours in seconds
+    CACHE_MAX_ENTRIES: int = 1024  # Memory cache size before least recently used entries are evicted
     
     # Whisper settings
     WHISPER_MODEL: str = "base"  # tiny, base, small, medium, large
@@ -36,12 +38,18 @@ class Settings(BaseSettings):
 
     # File storage settings
     TEMP_DIR: str = "tmp"
+    SCRATCH_DIR: Optional[str] = None  # Downloaded audio and uploads; None uses the system temp dir
+
+    # Job status settings
+    JOB_STATUS_MAX_ENTRIES: int = 1000  # Jobs kept in memory before the oldest are evicted
+    JOB_STATUS_TTL: int = 3600  # Seconds to keep finished job statuses
 
     # File upload settings
     MAX_FILE_SIZE_MB: int = 1000  # 1GB default for file uploads
 
     # Hardware settings
     USE_GPU: bool = False
+    MAX_CONCURRENT_JOBS: int = 4  # Worker threads for file upload transcriptions
     
     class Config:
         env_file = ".env"
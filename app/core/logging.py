@@ -35,17 +35,23 @@ def setup_logging(level: str = "INFO") -> None:
         datefmt=date_format,
     )
 
-    # Add file handler for transcription errors (logs/transcription.log)
+    # Add file handler for transcription errors (logs/transcription.log).
+    # create_app() may run more than once per process, so only attach it once.
+    root_logger = logging.getLogger()
+    log_path = os.path.join(os.getcwd(), "logs", "transcription.log")
+    if any(
+        isinstance(handler, logging.FileHandler)
+        and handler.baseFilename == os.path.abspath(log_path)
+        for handler in root_logger.handlers
+    ):
+        return
+
     try:
-        log_dir = os.path.join(os.getcwd(), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        file_handler = logging.FileHandler(
-            os.path.join(log_dir, "transcription.log"),
-            encoding="utf-8",
-        )
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        file_handler = logging.FileHandler(log_path, encoding="utf-8")
         file_handler.setLevel(logging.WARNING)
         file_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-        logging.getLogger().addHandler(file_handler)
+        root_logger.addHandler(file_handler)
     except OSError:
         pass  # Skip file logging if we can't write (e.g. read-only filesystem)
 
@@ -29,4 +29,4 @@ def transcribe_video():
     return jsonify({"transcription": mock_transcription})
 
 if __name__ == '__main__':
-    app.run(port=5050, debug=True)
+    app.run(port=5050)  # set FLASK_DEBUG=1 for the reloader and debugger
@@ -7,6 +7,7 @@ with support for in-memory and Redis backends.
 import time
 import json
 import asyncio
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 import logging
 
@@ -57,17 +58,24 @@ class CacheService:
 
 
 class MemoryCacheService(CacheService):
-    """In-memory cache service."""
+    """
+    In-memory cache service.
+
+    Entries expire after their TTL, and once ``maxsize`` entries are stored
+    the least recently used one is evicted to make room.
+    """
 
-    def __init__(self, ttl: int = 86400):
+    def __init__(self, ttl: int = 86400, maxsize: int = 1024):
         """
         Initialize the memory cache service.
         
         Args:
             ttl: Default time to live in seconds
+            maxsize: Maximum number of entries to keep
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.default_ttl = ttl
+        self.maxsize = maxsize
         
         # Start expiration loop
         self._expire_task = None
@@ -90,6 +98,7 @@ class MemoryCacheService(CacheService):
             await self.delete(key)
             return None
         
+        self.cache.move_to_end(key)
         return self.cache[key]["value"]
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
@@ -109,6 +118,11 @@ class MemoryCacheService(CacheService):
             "value": value,
             "expires_at": expires_at
         }
+        self.cache.move_to_end(key)
+        
+        # Evict least recently used entries
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
         return True
 
     async def delete(self, key: str) -> bool:
@@ -243,16 +257,26 @@ class RedisCacheService(CacheService):
             return False
 
 
+# Shared cache service instance, created on first use
+_cache_service: Optional[CacheService] = None
+
+
 def get_cache_service() -> CacheService:
     """
     Get the cache service based on configuration.
     
+    The instance is shared by all callers; a new MemoryCacheService per
+    call would start empty every time and never produce a hit.
+    
     Returns:
         Cache service instance
     """
-    cache_type = settings.CACHE_TYPE.lower()
-    
-    if cache_type == "redis":
-        return RedisCacheService(settings.REDIS_URL, settings.CACHE_TTL)
-    else:
-        return MemoryCacheService(settings.CACHE_TTL)
\ No newline at end of file
+    global _cache_service
+    if _cache_service is None:
+        cache_type = settings.CACHE_TYPE.lower()
+        
+        if cache_type == "redis":
+            _cache_service = RedisCacheService(settings.REDIS_URL, settings.CACHE_TTL)
+        else:
+            _cache_service = MemoryCacheService(settings.CACHE_TTL, settings.CACHE_MAX_ENTRIES)
+    return _cache_service
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+In-memory job status storage.
+
+This module provides a bounded store for transcription job statuses so
+that finished jobs do not accumulate for the lifetime of the process.
+"""
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator
+
+# Statuses after which a job is no longer updated by its worker
+FINISHED_STATUSES = ("complete", "error")
+
+
+class JobStatusStore(MutableMapping):
+    """
+    Job status dictionary with size and age limits.
+
+    Behaves like a regular dict keyed by job ID. Each new job prunes the
+    store: finished jobs are dropped ``ttl`` seconds after they are first
+    seen finished, and while the store holds more than ``maxsize`` jobs the
+    longest-finished ones are evicted early. Queued and running jobs are
+    never evicted, so the store can exceed ``maxsize`` while they run.
+
+    Workers should look up their job's status dict once and update it in
+    place; that dict stays valid even if the store evicts the entry while
+    the job is still running.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: int = 3600):
+        """
+        Initialize the job status store.
+
+        Args:
+            maxsize: Number of jobs above which finished jobs are evicted early
+            ttl: Seconds to keep a job's status once it has finished
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Jobs not yet seen finished, and finished jobs in the order they were
+        # seen finishing, so pruning never has to scan the finished ones
+        self._unfinished: Dict[str, None] = {}
+        self._finished_at: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        return self._jobs[job_id]
+
+    def __setitem__(self, job_id: str, status: Dict[str, Any]) -> None:
+        with self._lock:
+            self._forget(job_id)
+            self._jobs[job_id] = status
+            self._unfinished[job_id] = None
+            self._prune()
+
+    def __delitem__(self, job_id: str) -> None:
+        with self._lock:
+            del self._jobs[job_id]
+            self._forget(job_id)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._jobs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._jobs))
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _forget(self, job_id: str) -> None:
+        """Drop a job's bookkeeping, leaving its status entry alone."""
+        self._unfinished.pop(job_id, None)
+        self._finished_at.pop(job_id, None)
+
+    def _prune(self) -> None:
+        """Drop expired finished jobs, then the longest-finished ones over maxsize."""
+        now = time.monotonic()
+        # Workers update their status dict in place, so a job's finish time
+        # is stamped the first time a prune sees it in a finished state
+        newly_finished = [
+            job_id for job_id in self._unfinished
+            if self._jobs[job_id].get("status") in FINISHED_STATUSES
+        ]
+        for job_id in newly_finished:
+            del self._unfinished[job_id]
+            self._finished_at[job_id] = now
+
+        while self._finished_at:
+            job_id, finished_at = next(iter(self._finished_at.items()))
+            if now - finished_at <= self.ttl and len(self._jobs) <= self.maxsize:
+                # Entries are in finishing order, so the rest finished later
+                break
+            del self._finished_at[job_id]
+            del self._jobs[job_id]
@@ -1,5 +1,8 @@
 """
 Simple Whisper service implementation using OpenAI's API.
+
+Set USE_OPENAI_WHISPER=false to transcribe locally with faster-whisper
+(optional dependency) instead.
 """
 
 import os
@@ -7,9 +10,12 @@ import math
 import logging
 import tempfile
 import subprocess
+import threading
 from typing import Optional
 from openai import OpenAI
 from app.core.config import settings, settings_helper
+from app.utils import file_manager
+from app.utils.xml_parser import Caption, format_seconds_to_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -127,10 +133,57 @@ def get_openai_client():
     return OpenAI(api_key=api_key)
 
 
+# Local faster-whisper model, loaded on first use and shared by all jobs
+_local_model = None
+_local_model_lock = threading.Lock()
+
+
+def get_local_model():
+    """Get the faster-whisper model, loading it on first use."""
+    global _local_model
+    if _local_model is None:
+        with _local_model_lock:
+            if _local_model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    logger.error("faster-whisper package not installed - please install with 'pip install faster-whisper'")
+                    raise
+                # int8 weights run several times faster than FP32 at about the same accuracy
+                if settings.USE_GPU:
+                    device, compute_type = "cuda", "int8_float16"
+                else:
+                    device, compute_type = "cpu", "int8"
+                logger.info(f"Loading faster-whisper model '{settings.WHISPER_MODEL}' on {device} ({compute_type})")
+                _local_model = WhisperModel(settings.WHISPER_MODEL, device=device, compute_type=compute_type)
+    return _local_model
+
+
+def _transcribe_locally(file_path: str, language: Optional[str]) -> dict:
+    """Transcribe a file with the local faster-whisper model."""
+    segments, _info = get_local_model().transcribe(file_path, language=language)
+
+    # Local transcription has real segment timings, so subtitles use them
+    captions = [
+        Caption(
+            format_seconds_to_timestamp(segment.start),
+            format_seconds_to_timestamp(segment.end),
+            segment.text.strip(),
+        )
+        for segment in segments
+    ]
+    return {
+        "text": " ".join(caption.text for caption in captions),
+        "srt": file_manager.convert_to_srt(captions),
+        "vtt": file_manager.convert_to_vtt(captions),
+    }
+
+
 def transcribe_audio_file(file_path, language=None):
     """
     Transcribe an audio file using OpenAI's Whisper API.
     Files larger than 25MB are automatically split into chunks.
+    With USE_OPENAI_WHISPER disabled the file is transcribed locally instead.
 
     Args:
         file_path (str): Path to the audio file
@@ -140,6 +193,9 @@ def transcribe_audio_file(file_path, language=None):
         dict: Transcription in multiple formats (text, srt, vtt)
     """
     try:
+        if not settings.USE_OPENAI_WHISPER:
+            return _transcribe_locally(file_path, language)
+
         file_size = os.path.getsize(file_path)
         client = get_openai_client()
 
@@ -160,9 +216,10 @@ def transcribe_audio_file(file_path, language=None):
                     texts.append(text)
                 transcription_text = "\n\n".join(t.strip() for t in texts if t.strip())
 
-        # Convert to SRT and VTT formats
-        srt_content = convert_to_srt(transcription_text)
-        vtt_content = convert_to_vtt(transcription_text)
+        # The API returns plain text, so subtitles use evenly timed cues
+        captions = file_manager.text_to_captions(transcription_text)
+        srt_content = file_manager.convert_to_srt(captions)
+        vtt_content = file_manager.convert_to_vtt(captions)
 
         return {"text": transcription_text, "srt": srt_content, "vtt": vtt_content}
     except Exception as e:
@@ -287,103 +344,3 @@ def extract_videos_from_playlist(playlist_url):
     except Exception as e:
         print(f"Error extracting playlist videos: {e}")
         return {"title": "YouTube Playlist", "videos": [], "count": 0}
-
-
-def convert_to_srt(text, chunk_duration=5):
-    """
-    Convert plain text to SRT format.
-
-    Args:
-        text (str): Plain text transcription
-        chunk_duration (int): Duration of each subtitle chunk in seconds
-
-    Returns:
-        str: SRT formatted text
-    """
-    # Split text into chunks (simple implementation)
-    words = text.split()
-    chunks = []
-    current_chunk = []
-
-    for word in words:
-        current_chunk.append(word)
-        if len(current_chunk) >= 10:  # ~10 words per chunk
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-
-    # Generate SRT
-    srt = ""
-    for i, chunk in enumerate(chunks):
-        start_time = i * chunk_duration
-        end_time = (i + 1) * chunk_duration
-
-        # Format start and end times (HH:MM:SS,mmm)
-        start_formatted = format_time_srt(start_time)
-        end_formatted = format_time_srt(end_time)
-
-        srt += f"{i + 1}\n{start_formatted} --> {end_formatted}\n{chunk}\n\n"
-
-    return srt
-
-
-def convert_to_vtt(text, chunk_duration=5):
-    """
-    Convert plain text to WebVTT format.
-
-    Args:
-        text (str): Plain text transcription
-        chunk_duration (int): Duration of each subtitle chunk in seconds
-
-    Returns:
-        str: WebVTT formatted text
-    """
-    # Start with WebVTT header
-    vtt = "WEBVTT\n\n"
-
-    # Split text into chunks (simple implementation)
-    words = text.split()
-    chunks = []
-    current_chunk = []
-
-    for word in words:
-        current_chunk.append(word)
-        if len(current_chunk) >= 10:  # ~10 words per chunk
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-
-    # Generate VTT cues
-    for i, chunk in enumerate(chunks):
-        start_time = i * chunk_duration
-        end_time = (i + 1) * chunk_duration
-
-        # Format start and end times (HH:MM:SS.mmm)
-        start_formatted = format_time_vtt(start_time)
-        end_formatted = format_time_vtt(end_time)
-
-        vtt += f"{start_formatted} --> {end_formatted}\n{chunk}\n\n"
-
-    return vtt
-
-
-def format_time_srt(seconds):
-    """Format seconds to SRT timestamp (HH:MM:SS,mmm)"""
-    hours = int(seconds / 3600)
-    minutes = int((seconds % 3600) / 60)
-    seconds = int(seconds % 60)
-    milliseconds = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-
-
-def format_time_vtt(seconds):
-    """Format seconds to WebVTT timestamp (HH:MM:SS.mmm)"""
-    hours = int(seconds / 3600)
-    minutes = int((seconds % 3600) / 60)
-    seconds = int(seconds % 60)
-    milliseconds = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
@@ -9,7 +9,7 @@ import xml.etree.ElementTree as ET
 import yt_dlp
 
 from app.core.config import settings
-from app.utils.xml_parser import parse_xml_captions
+from app.utils.xml_parser import Caption, parse_xml_captions
 from app.utils.file_manager import convert_to_vtt, convert_to_srt
 
 logger = logging.getLogger(__name__)
@@ -200,7 +200,7 @@ class YouTubeService:
             parsed_captions = parse_xml_captions(captions_content)
             
             # Generate output in different formats
-            text = "\n".join([f"{entry['text']}" for entry in parsed_captions])
+            text = "\n".join([entry.text for entry in parsed_captions])
             srt = convert_to_srt(parsed_captions)
             vtt = convert_to_vtt(parsed_captions)
             
@@ -209,32 +209,30 @@ class YouTubeService:
             # Convert VTT to our internal format
             lines = captions_content.strip().split('\n')
             parsed_captions = []
-            current_entry = None
+            current_times = None
+            current_text = []
             
             for line in lines:
                 if line.strip() == 'WEBVTT' or not line.strip():
                     continue
                 elif '-->' in line:
                     # Time line
-                    if current_entry:
-                        parsed_captions.append(current_entry)
+                    if current_times:
+                        parsed_captions.append(Caption(*current_times, ' '.join(current_text)))
                     
                     start, end = line.split('-->')
-                    current_entry = {
-                        'start': start.strip(),
-                        'end': end.strip(),
-                        'text': ''
-                    }
-                elif current_entry:
+                    current_times = (start.strip(), end.strip())
+                    current_text = []
+                elif current_times:
                     # Text line
-                    current_entry['text'] += line.strip() + ' '
+                    current_text.append(line.strip())
             
             # Add the last entry
-            if current_entry:
-                parsed_captions.append(current_entry)
+            if current_times:
+                parsed_captions.append(Caption(*current_times, ' '.join(current_text)))
             
             # Generate output in different formats
-            text = "\n".join([entry['text'].strip() for entry in parsed_captions])
+            text = "\n".join([entry.text for entry in parsed_captions])
             srt = convert_to_srt(parsed_captions)
             vtt = captions_content  # Already in VTT format
             
@@ -256,14 +254,10 @@ class YouTubeService:
                     match = re.match(r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', timestamp)
                     if match:
                         start, end = match.groups()
-                        parsed_captions.append({
-                            'start': start,
-                            'end': end,
-                            'text': text
-                        })
+                        parsed_captions.append(Caption(start, end, text))
             
             # Generate output in different formats
-            text = "\n".join([entry['text'] for entry in parsed_captions])
+            text = "\n".join([entry.text for entry in parsed_captions])
             srt = captions_content  # Already in SRT format
             vtt = convert_to_vtt(parsed_captions)
             
@@ -272,11 +266,7 @@ class YouTubeService:
             text = captions_content
             
             # Create a simple entry for SRT and VTT
-            parsed_captions = [{
-                'start': '00:00:00,000',
-                'end': '99:59:59,999',
-                'text': text
-            }]
+            parsed_captions = [Caption('00:00:00,000', '99:59:59,999', text)]
             
             srt = convert_to_srt(parsed_captions)
             vtt = convert_to_vtt(parsed_captions)
@@ -0,0 +1,20 @@
+import asyncio
+
+from app.services.cache_service import MemoryCacheService
+
+
+# Test least-recently-used eviction
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCacheService(ttl=3600, maxsize=2)
+
+    async def run():
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+
+    asyncio.run(run())
@@ -1,6 +1,6 @@
 import pytest
-from app.utils.xml_parser import parse_xml_captions, convert_timestamp_to_srt, format_seconds_to_timestamp
-from app.utils.file_manager import convert_to_srt, convert_to_vtt, ensure_srt_timestamp_format, convert_timestamp_to_vtt
+from app.utils.xml_parser import Caption, parse_xml_captions, convert_timestamp_to_srt, format_seconds_to_timestamp
+from app.utils.file_manager import convert_to_srt, convert_to_vtt, ensure_srt_timestamp_format, convert_timestamp_to_vtt, save_transcription_formats, text_to_captions
 
 
 # Test XML parsing
@@ -19,9 +19,9 @@ def test_parse_xml_captions():
     captions = parse_xml_captions(xml_content)
     
     assert len(captions) == 2
-    assert captions[0]["start"] == "00:00:00,000"
-    assert captions[0]["end"] == "00:00:05,000"
-    assert captions[0]["text"] == "This is the first caption"
+    assert captions[0].start == "00:00:00,000"
+    assert captions[0].end == "00:00:05,000"
+    assert captions[0].text == "This is the first caption"
     
     # Test YT format
     xml_content = """
@@ -35,7 +35,7 @@ def test_parse_xml_captions():
     captions = parse_xml_captions(xml_content)
     
     assert len(captions) == 2
-    assert captions[0]["text"] == "This is the first caption"
+    assert captions[0].text == "This is the first caption"
     
     # Test invalid XML
     with pytest.raises(ValueError):
@@ -69,8 +69,8 @@ def test_format_seconds_to_timestamp():
 # Test SRT conversion
 def test_convert_to_srt():
     captions = [
-        {"start": "00:00:00,000", "end": "00:00:05,000", "text": "This is the first caption"},
-        {"start": "00:00:05,000", "end": "00:00:10,000", "text": "This is the second caption"}
+        Caption("00:00:00,000", "00:00:05,000", "This is the first caption"),
+        Caption("00:00:05,000", "00:00:10,000", "This is the second caption")
     ]
     
     srt = convert_to_srt(captions)
@@ -91,8 +91,8 @@ def test_convert_to_srt():
 # Test VTT conversion
 def test_convert_to_vtt():
     captions = [
-        {"start": "00:00:00,000", "end": "00:00:05,000", "text": "This is the first caption"},
-        {"start": "00:00:05,000", "end": "00:00:10,000", "text": "This is the second caption"}
+        Caption("00:00:00,000", "00:00:05,000", "This is the first caption"),
+        Caption("00:00:05,000", "00:00:10,000", "This is the second caption")
     ]
     
     vtt = convert_to_vtt(captions)
@@ -110,6 +110,19 @@ def test_convert_to_vtt():
     assert vtt == expected
 
 
+# Test splitting plain text into timed cues
+def test_text_to_captions():
+    text = " ".join(f"w{i}" for i in range(12))
+    
+    captions = text_to_captions(text, chunk_duration=5, words_per_chunk=10)
+    
+    assert captions == [
+        Caption("00:00:00,000", "00:00:05,000", " ".join(f"w{i}" for i in range(10))),
+        Caption("00:00:05,000", "00:00:10,000", "w10 w11"),
+    ]
+    assert text_to_captions("") == []
+
+
 # Test timestamp format conversion
 def test_ensure_srt_timestamp_format():
     # Test SRT format
@@ -126,3 +139,17 @@ def test_ensure_srt_timestamp_format():
 def test_convert_timestamp_to_vtt():
     # Test SRT to VTT conversion
     assert convert_timestamp_to_vtt("00:00:00,000") == "00:00:00.000"
+
+
+# Test saving a transcription in all formats
+def test_save_transcription_formats(tmp_path):
+    transcription = {"text": "Héllo", "srt": "1\n00:00:00,000 --> 00:00:01,000\nHéllo\n", "vtt": "WEBVTT\n"}
+
+    files = save_transcription_formats(str(tmp_path), "video", transcription)
+
+    assert set(files) == {"txt", "srt", "vtt"}
+    assert files["txt"] == str(tmp_path / "video.txt")
+    with open(files["txt"], encoding="utf-8") as f:
+        assert f.read() == "Héllo"
+    with open(files["srt"], encoding="utf-8") as f:
+        assert f.read() == transcription["srt"]
@@ -0,0 +1,72 @@
+import time
+
+from app.services.job_store import JobStatusStore
+
+
+# Test size-based eviction
+def test_job_store_evicts_oldest_finished_over_maxsize():
+    store = JobStatusStore(maxsize=2, ttl=3600)
+
+    store["a"] = {"status": "complete"}
+    store["b"] = {"status": "error"}
+    store["c"] = {"status": "queued"}
+
+    assert list(store) == ["b", "c"]
+    assert store["c"]["status"] == "queued"
+
+
+# Test that jobs still in progress are never evicted for size
+def test_job_store_keeps_unfinished_jobs_over_maxsize():
+    store = JobStatusStore(maxsize=2, ttl=3600)
+
+    store["a"] = {"status": "queued"}
+    store["b"] = {"status": "transcribing_audio"}
+    store["c"] = {"status": "queued"}
+
+    assert list(store) == ["a", "b", "c"]
+
+    store["a"]["status"] = "complete"
+    store["d"] = {"status": "queued"}
+
+    assert list(store) == ["b", "c", "d"]
+
+
+# Test age-based eviction
+def test_job_store_expires_only_finished_jobs():
+    store = JobStatusStore(maxsize=10, ttl=0)
+
+    store["done"] = {"status": "complete"}
+    store["running"] = {"status": "transcribing_audio"}
+    time.sleep(0.01)
+    store["new"] = {"status": "queued"}
+
+    assert "done" not in store
+    assert "running" in store
+    assert "new" in store
+
+
+# Test that the TTL counts from when a job finishes, not when it was added
+def test_job_store_ttl_starts_when_job_finishes():
+    store = JobStatusStore(maxsize=10, ttl=0.05)
+
+    store["slow"] = {"status": "transcribing_audio"}
+    time.sleep(0.1)
+    store["slow"]["status"] = "complete"
+    store["other"] = {"status": "queued"}
+
+    assert "slow" in store
+
+
+# Test that pop and popitem keep the bookkeeping in sync
+def test_job_store_pop_clears_finish_time():
+    store = JobStatusStore(maxsize=10, ttl=3600)
+
+    store["a"] = {"status": "complete"}
+    store["b"] = {"status": "complete"}
+    store["c"] = {"status": "queued"}
+
+    assert store.pop("a")["status"] == "complete"
+    store.popitem()
+
+    assert len(store) == 1
+    assert set(store._finished_at) | set(store._unfinished) == set(store)
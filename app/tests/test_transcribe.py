@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import os
 from unittest.mock import patch, MagicMock
@@ -92,6 +93,21 @@ def test_transcribe_endpoint(mock_extract_video_id, client):
     assert response.status_code == 422  # Validation error
 
 
+# Test that concurrent requests for the same video share one job
+@patch('app.api.transcribe.process_transcription')
+def test_transcribe_reuses_in_progress_job(mock_process_transcription, client):
+    body = {"url": "https://youtu.be/jNQXAC9IVRw", "mode": "whisper", "lang": "en"}
+
+    first = client.post("/api/transcribe", json=body).json()
+    second = client.post("/transcribe", json=body).json()
+
+    assert first["job_id"] == second["job_id"]
+    assert mock_process_transcription.call_count == 1
+
+    other = client.post("/api/transcribe", json={**body, "lang": "de"}).json()
+    assert other["job_id"] != first["job_id"]
+
+
 # Test the transcription process function
 @pytest.mark.asyncio
 @patch('app.services.youtube_service.YouTubeService.download_captions')
@@ -192,3 +208,38 @@ def test_job_status_endpoint(mock_job_statuses, client):
     response = client.get("/api/job/nonexistent-job/status")
     
     assert response.status_code == 404
+
+
+# Test that unchanged job statuses are answered with 304
+def test_job_status_not_modified(client):
+    from app.api.transcribe import job_statuses
+
+    job_id = "test-etag-job"
+    job_statuses[job_id] = {"status": "transcribing_audio", "percent": 70}
+
+    response = client.get(f"/api/job/{job_id}/status")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get(f"/api/job/{job_id}/status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    job_statuses[job_id]["status"] = "complete"
+    job_statuses[job_id]["percent"] = 100
+    response = client.get(f"/api/job/{job_id}/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "complete"
+
+    del job_statuses[job_id]
+
+
+# A job that was evicted or never registered is skipped, not raised on
+def test_process_transcription_missing_job():
+    request = TranscriptionRequest(
+        url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        mode="captions",
+        lang="en"
+    )
+    video_id = "dQw4w9WgXcQ"
+
+    asyncio.run(process_transcription("missing-job-id", request, video_id, f"{video_id}_captions_en"))
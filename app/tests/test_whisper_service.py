@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services import whisper_service
+
+
+# Test local faster-whisper transcription
+@patch('app.services.whisper_service.get_local_model')
+@patch('app.services.whisper_service.settings')
+def test_transcribe_audio_file_locally(mock_settings, mock_get_local_model):
+    mock_settings.USE_OPENAI_WHISPER = False
+    segments = [
+        SimpleNamespace(start=0.0, end=2.5, text=" Hello there."),
+        SimpleNamespace(start=2.5, end=4.0, text=" General Kenobi."),
+    ]
+    mock_model = MagicMock()
+    mock_model.transcribe.return_value = (iter(segments), None)
+    mock_get_local_model.return_value = mock_model
+
+    result = whisper_service.transcribe_audio_file("audio.mp3", language="en")
+
+    mock_model.transcribe.assert_called_once_with("audio.mp3", language="en")
+    assert result["text"] == "Hello there. General Kenobi."
+    # Each segment becomes one cue with its own timings
+    assert result["srt"] == (
+        "1\n"
+        "00:00:00,000 --> 00:00:02,500\n"
+        "Hello there.\n"
+        "\n"
+        "2\n"
+        "00:00:02,500 --> 00:00:04,000\n"
+        "General Kenobi.\n"
+    )
+    assert "00:00:02.500 --> 00:00:04.000\nGeneral Kenobi.\n" in result["vtt"]
@@ -1,13 +1,15 @@
 import os
 import re
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, List
 
 import logging
 
+from app.utils.xml_parser import Caption, format_seconds_to_timestamp
+
 logger = logging.getLogger(__name__)
 
 
-def convert_to_srt(captions: List[Dict[str, Any]]) -> str:
+def convert_to_srt(captions: List[Caption]) -> str:
     """
     Convert captions to SRT format.
     
@@ -21,8 +23,8 @@ def convert_to_srt(captions: List[Dict[str, Any]]) -> str:
     
     for i, caption in enumerate(captions, 1):
         # Format start and end times for SRT
-        start = caption['start']
-        end = caption['end']
+        start = caption.start
+        end = caption.end
         
         # Ensure times are in correct format (HH:MM:SS,mmm)
         start = ensure_srt_timestamp_format(start)
@@ -31,13 +33,13 @@ def convert_to_srt(captions: List[Dict[str, Any]]) -> str:
         # Add entry to SRT
         srt_lines.append(str(i))
         srt_lines.append(f"{start} --> {end}")
-        srt_lines.append(caption['text'])
+        srt_lines.append(caption.text)
         srt_lines.append("")
     
     return "\n".join(srt_lines)
 
 
-def convert_to_vtt(captions: List[Dict[str, Any]]) -> str:
+def convert_to_vtt(captions: List[Caption]) -> str:
     """
     Convert captions to WebVTT format.
     
@@ -51,8 +53,8 @@ def convert_to_vtt(captions: List[Dict[str, Any]]) -> str:
     
     for caption in captions:
         # Format start and end times for VTT
-        start = caption['start']
-        end = caption['end']
+        start = caption.start
+        end = caption.end
         
         # Convert timestamps from SRT to VTT format
         start = convert_timestamp_to_vtt(start)
@@ -60,12 +62,40 @@ def convert_to_vtt(captions: List[Dict[str, Any]]) -> str:
         
         # Add entry to VTT
         vtt_lines.append(f"{start} --> {end}")
-        vtt_lines.append(caption['text'])
+        vtt_lines.append(caption.text)
         vtt_lines.append("")
     
     return "\n".join(vtt_lines)
 
 
+def text_to_captions(text: str, chunk_duration: int = 5, words_per_chunk: int = 10) -> List[Caption]:
+    """
+    Split plain text into evenly timed caption cues.
+    
+    Used when a transcript has no segment timings of its own, such as the
+    plain-text Whisper API response.
+    
+    Args:
+        text: Plain text transcription
+        chunk_duration: Duration of each cue in seconds
+        words_per_chunk: Number of words in each cue
+        
+    Returns:
+        List of captions, one per chunk of words
+    """
+    words = text.split()
+    captions = []
+    
+    # Each cue starts where the previous one ended, so every boundary is formatted once
+    start = format_seconds_to_timestamp(0)
+    for i in range(0, len(words), words_per_chunk):
+        end = format_seconds_to_timestamp((i // words_per_chunk + 1) * chunk_duration)
+        captions.append(Caption(start, end, " ".join(words[i:i + words_per_chunk])))
+        start = end
+    
+    return captions
+
+
 def ensure_srt_timestamp_format(timestamp: str) -> str:
     """
     Ensure timestamp is in SRT format (HH:MM:SS,mmm).
@@ -109,3 +139,48 @@ def convert_timestamp_to_vtt(timestamp: str) -> str:
     """
     # Convert from "HH:MM:SS,mmm" to "HH:MM:SS.mmm"
     return timestamp.replace(',', '.')
+
+
+# Characters not allowed in file names on common filesystems
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+
+# Transcription keys written for each output file extension
+TRANSCRIPTION_FORMATS = {"txt": "text", "srt": "srt", "vtt": "vtt"}
+
+
+def write_text_file(path: str, content: str) -> None:
+    """
+    Write text to a file as UTF-8 without going through a buffered file object.
+    
+    Args:
+        path: Destination file path
+        content: Text to write
+    """
+    data = memoryview(content.encode("utf-8"))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+
+
+def save_transcription_formats(directory: str, base_name: str, transcription: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Save a transcription as .txt, .srt and .vtt files.
+    
+    Args:
+        directory: Existing directory to write into
+        base_name: File name without extension
+        transcription: Transcription data with text, srt, and vtt formats
+        
+    Returns:
+        Dictionary with file paths for different formats
+    """
+    files = {}
+    for ext, key in TRANSCRIPTION_FORMATS.items():
+        path = os.path.join(directory, f"{base_name}.{ext}")
+        write_text_file(path, transcription[key])
+        files[ext] = path
+    return files
@@ -1,13 +1,27 @@
 import re
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional
+from typing import List, NamedTuple
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def parse_xml_captions(xml_content: str) -> List[Dict[str, Any]]:
+class Caption(NamedTuple):
+    """
+    A single caption cue.
+
+    Attributes:
+        start: Start time in SRT format "HH:MM:SS,mmm"
+        end: End time in SRT format "HH:MM:SS,mmm"
+        text: Caption text
+    """
+    start: str
+    end: str
+    text: str
+
+
+def parse_xml_captions(xml_content: str) -> List[Caption]:
     """
     Parse XML captions from YouTube.
     
@@ -18,8 +32,8 @@ def parse_xml_captions(xml_content: str) -> List[Dict[str, Any]]:
         List of caption entries with start time, end time, and text
     """
     try:
-        # Parse XML
-        root = ET.fromstring(xml_content)
+        # Parse XML (leading whitespace before the XML declaration is not allowed)
+        root = ET.fromstring(xml_content.strip())
         
         # Extract namespace
         namespace = ''
@@ -41,11 +55,11 @@ def parse_xml_captions(xml_content: str) -> List[Dict[str, Any]]:
                     text = ''.join(p.itertext()).strip()
                     
                     if begin and end and text:
-                        captions.append({
-                            'start': convert_timestamp_to_srt(begin),
-                            'end': convert_timestamp_to_srt(end),
-                            'text': text
-                        })
+                        captions.append(Caption(
+                            convert_timestamp_to_srt(begin),
+                            convert_timestamp_to_srt(end),
+                            text
+                        ))
         else:
             # Handle TTML format (without namespace)
             body = root.find('.//body')
@@ -56,11 +70,11 @@ def parse_xml_captions(xml_content: str) -> List[Dict[str, Any]]:
                     text = ''.join(p.itertext()).strip()
                     
                     if begin and end and text:
-                        captions.append({
-                            'start': convert_timestamp_to_srt(begin),
-                            'end': convert_timestamp_to_srt(end),
-                            'text': text
-                        })
+                        captions.append(Caption(
+                            convert_timestamp_to_srt(begin),
+                            convert_timestamp_to_srt(end),
+                            text
+                        ))
         
         # If no captions found, try another format
         if not captions:
@@ -77,11 +91,7 @@ def parse_xml_captions(xml_content: str) -> List[Dict[str, Any]]:
                     end = format_seconds_to_timestamp(end_float)
                     text = text_element.text or ''
                     
-                    captions.append({
-                        'start': start,
-                        'end': end,
-                        'text': text.strip()
-                    })
+                    captions.append(Caption(start, end, text.strip()))
         
         return captions
     except Exception as e:
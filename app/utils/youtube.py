@@ -7,6 +7,17 @@ from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# YouTube URL formats, combined into one pattern so a URL is scanned once:
+# standard and short URLs, embedded videos, legacy URLs, user uploads, other formats
+VIDEO_ID_PATTERN = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/'
+    r'|youtube\.com/embed/'
+    r'|youtube\.com/v/'
+    r'|youtube\.com/user/\w+/\w+/'
+    r'|youtube\.com/\w+/\w+/)'
+    r'([a-zA-Z0-9_-]{11})'
+)
+
 def extract_video_id(url: str) -> Optional[str]:
     """
     Extract YouTube video ID from a URL.
@@ -20,21 +31,8 @@ def extract_video_id(url: str) -> Optional[str]:
     if not url:
         return None
     
-    # Regular expressions for different YouTube URL formats
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})',  # Standard and short URLs
-        r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',  # Embedded videos
-        r'youtube\.com/v/([a-zA-Z0-9_-]{11})',  # Legacy URLs
-        r'youtube\.com/user/\w+/\w+/([a-zA-Z0-9_-]{11})',  # User uploads
-        r'youtube\.com/\w+/\w+/([a-zA-Z0-9_-]{11})'  # Other formats
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return None
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
 
 def parse_time_parameter(time_param: Optional[str]) -> Optional[float]:
     """
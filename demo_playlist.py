@@ -4,7 +4,13 @@ Demo with a working public YouTube playlist that supports proxy functionality
 """
 
 import os
-from standalone_whisper import extract_playlist_videos, get_proxy_config, is_playlist_url
+import sys
+from functools import lru_cache
+from standalone_whisper import extract_playlist_videos, is_playlist_url
+from standalone_whisper import get_proxy_config as _get_proxy_config
+
+# The proxy settings don't change during a demo run, so resolve them once
+get_proxy_config = lru_cache(maxsize=1)(_get_proxy_config)
 
 def demo_with_working_playlist():
     """Demo the system with a known working playlist"""
@@ -27,15 +33,18 @@ def demo_with_working_playlist():
         videos = extract_playlist_videos(working_playlist, proxy)
         
         if videos:
-            print(f"✅ Found {len(videos)} videos in playlist:")
+            lines = [f"✅ Found {len(videos)} videos in playlist:"]
             for i, video in enumerate(videos):
-                print(f"   {i+1}. {video['title']}")
-                print(f"      ID: {video['id']}")
-                print(f"      URL: {video['url']}")
+                lines.append(f"   {i+1}. {video['title']}")
+                lines.append(f"      ID: {video['id']}")
+                lines.append(f"      URL: {video['url']}")
             
-            print(f"\n🎯 This playlist is ready for transcription!")
-            print(f"You can now use this URL in your application:")
-            print(f"   {working_playlist}")
+            lines += [
+                "\n🎯 This playlist is ready for transcription!",
+                "You can now use this URL in your application:",
+                f"   {working_playlist}",
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
             
         else:
             print("❌ No videos found in playlist")
@@ -44,14 +53,16 @@ def demo_with_working_playlist():
         print(f"❌ Error: {e}")
         
         if "does not exist" in str(e).lower():
-            print("\n💡 The playlist might be:")
-            print("   - Private or deleted")
-            print("   - Region-blocked")
-            print("   - Requiring sign-in")
-            print("\n🔧 Try setting up a proxy:")
-            print("   export YOUTUBE_PROXY='socks5://proxy:port'")
-            print("   # or")
-            print("   export YOUTUBE_PROXY='http://proxy:port'")
+            sys.stdout.write("\n".join([
+                "\n💡 The playlist might be:",
+                "   - Private or deleted",
+                "   - Region-blocked",
+                "   - Requiring sign-in",
+                "\n🔧 Try setting up a proxy:",
+                "   export YOUTUBE_PROXY='socks5://proxy:port'",
+                "   # or",
+                "   export YOUTUBE_PROXY='http://proxy:port'",
+            ]) + "\n")
 
 def test_with_your_playlist():
     """Test the playlist you originally provided"""
@@ -69,47 +80,52 @@ def test_with_your_playlist():
     try:
         videos = extract_playlist_videos(your_playlist, proxy)
         if videos:
-            print(f"✅ Success! Found {len(videos)} videos:")
-            for i, video in enumerate(videos):
-                print(f"   {i+1}. {video['title']}")
+            lines = [f"✅ Success! Found {len(videos)} videos:"]
+            lines.extend(f"   {i+1}. {video['title']}" for i, video in enumerate(videos))
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print("❌ Playlist is empty")
     except Exception as e:
         print(f"❌ Error: {e}")
         
-        print(f"\n💡 Possible solutions:")
-        print(f"1. Check if the playlist is public")
-        print(f"2. Try accessing it in a browser first")
-        print(f"3. Set up a proxy/VPN")
-        print(f"4. Use a different playlist URL")
+        sys.stdout.write("\n".join([
+            "\n💡 Possible solutions:",
+            "1. Check if the playlist is public",
+            "2. Try accessing it in a browser first",
+            "3. Set up a proxy/VPN",
+            "4. Use a different playlist URL",
+        ]) + "\n")
 
 def show_proxy_setup():
     """Show how to set up proxy"""
-    print(f"\n🔧 Proxy Setup Guide:")
-    print("=" * 30)
-    print("1. Quick test with a free proxy:")
-    print("   export YOUTUBE_PROXY='socks5://127.0.0.1:1080'  # If you have local SOCKS")
-    print("   export YOUTUBE_PROXY='http://proxy.example.com:8080'")
-    print("")
-    print("2. Premium proxy services (recommended for production):")
-    print("   - ProxyMesh: https://proxymesh.com/")
-    print("   - Bright Data: https://brightdata.com/")
-    print("   - SmartProxy: https://smartproxy.com/")
-    print("")
-    print("3. VPN as alternative:")
-    print("   - Use a VPN service to change your location")
-    print("   - Some VPNs work better than others with YouTube")
-    print("")
-    print("4. Test proxy configuration:")
-    print("   python proxy_config.py")
+    sys.stdout.write("\n".join([
+        "\n🔧 Proxy Setup Guide:",
+        "=" * 30,
+        "1. Quick test with a free proxy:",
+        "   export YOUTUBE_PROXY='socks5://127.0.0.1:1080'  # If you have local SOCKS",
+        "   export YOUTUBE_PROXY='http://proxy.example.com:8080'",
+        "",
+        "2. Premium proxy services (recommended for production):",
+        "   - ProxyMesh: https://proxymesh.com/",
+        "   - Bright Data: https://brightdata.com/",
+        "   - SmartProxy: https://smartproxy.com/",
+        "",
+        "3. VPN as alternative:",
+        "   - Use a VPN service to change your location",
+        "   - Some VPNs work better than others with YouTube",
+        "",
+        "4. Test proxy configuration:",
+        "   python proxy_config.py",
+    ]) + "\n")
 
 def demo_functionality():
     """Show the current functionality with mock data"""
-    print("\n🎯 Current Implementation Status:")
-    print("=" * 40)
-    
-    # Demo URL Detection
-    print("1. URL Detection:")
+    lines = [
+        "\n🎯 Current Implementation Status:",
+        "=" * 40,
+        # Demo URL Detection
+        "1. URL Detection:",
+    ]
     test_urls = [
         "https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # Single video
         "https://www.youtube.com/playlist?list=PLl7bF1DNa5BWB__nvu-Nzbe3sZbn--qK4",  # Playlist
@@ -118,16 +134,19 @@ def demo_functionality():
     
     for url in test_urls:
         is_playlist = is_playlist_url(url)
-        print(f"   {'📋 PLAYLIST' if is_playlist else '📹 SINGLE VIDEO'}: {url[:60]}...")
+        lines.append(f"   {'📋 PLAYLIST' if is_playlist else '📹 SINGLE VIDEO'}: {url[:60]}...")
     
-    print("\n2. Features Implemented:")
-    print("   ✅ Automatic playlist URL detection")
-    print("   ✅ Individual video extraction from playlists")
-    print("   ✅ Proxy support for YouTube restrictions")
-    print("   ✅ Enhanced error handling and retries")
-    print("   ✅ Progress tracking for multiple videos")
-    print("   ✅ ZIP packaging for bulk downloads")
-    print("   ✅ Frontend adaptation for playlist workflow")
+    lines += [
+        "\n2. Features Implemented:",
+        "   ✅ Automatic playlist URL detection",
+        "   ✅ Individual video extraction from playlists",
+        "   ✅ Proxy support for YouTube restrictions",
+        "   ✅ Enhanced error handling and retries",
+        "   ✅ Progress tracking for multiple videos",
+        "   ✅ ZIP packaging for bulk downloads",
+        "   ✅ Frontend adaptation for playlist workflow",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     # Demo with working playlist
@@ -7,10 +7,11 @@ import os
 import sys
 import uvicorn
 from app import create_app
+from app.core.config import settings
 
 # Create the FastAPI application instance
 app = create_app()
 
 if __name__ == "__main__":
     # For direct execution, use uvicorn
-    uvicorn.run("main:app", host="127.0.0.1", port=5050, reload=True)
+    uvicorn.run("main:app", host="127.0.0.1", port=5050, reload=settings.DEBUG)
@@ -7,6 +7,40 @@ This file contains proxy configuration options to help bypass YouTube restrictio
 """
 
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import requests
+import urllib3
+from urllib3.exceptions import InsecureRequestWarning
+
+# orjson parses test responses faster; fall back to the standard library
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Proxy tests skip certificate checks, so silence urllib3's warning about it once
+urllib3.disable_warnings(InsecureRequestWarning)
+
+# Proxy settings from the environment, read once into _ENV instead of on every
+# lookup. Set them before this module is imported; variables changed later are
+# only picked up after calling refresh_proxy()
+_ENV_KEYS = (
+    "YOUTUBE_PROXY",
+    "PROXYMESH_USERNAME", "PROXYMESH_PASSWORD",
+    "BRIGHT_DATA_USERNAME", "BRIGHT_DATA_PASSWORD",
+    "SMARTPROXY_USERNAME", "SMARTPROXY_PASSWORD",
+)
+
+def _read_env():
+    """Snapshot the proxy-related environment variables."""
+    return {key: os.environ.get(key) for key in _ENV_KEYS}
+
+_ENV = _read_env()
 
 # =============================================================================
 # PUBLIC PROXY SERVICES (Use with caution - may be slow or unreliable)
@@ -32,8 +66,8 @@ PUBLIC_HTTP_PROXIES = [
 # ProxyMesh (paid service)
 PROXYMESH_CONFIG = {
     "enabled": False,
-    "username": os.getenv("PROXYMESH_USERNAME"),
-    "password": os.getenv("PROXYMESH_PASSWORD"),
+    "username": _ENV["PROXYMESH_USERNAME"],
+    "password": _ENV["PROXYMESH_PASSWORD"],
     "endpoints": [
         "rotating-residential.proxymesh.com:31280",
         "us-wa.proxymesh.com:31280",
@@ -43,23 +77,83 @@ PROXYMESH_CONFIG = {
 # Bright Data (formerly Luminati) - paid service
 BRIGHT_DATA_CONFIG = {
     "enabled": False,
-    "username": os.getenv("BRIGHT_DATA_USERNAME"), 
-    "password": os.getenv("BRIGHT_DATA_PASSWORD"),
+    "username": _ENV["BRIGHT_DATA_USERNAME"], 
+    "password": _ENV["BRIGHT_DATA_PASSWORD"],
     "endpoint": "brd.superproxy.io:22225"
 }
 
 # SmartProxy - paid service
 SMARTPROXY_CONFIG = {
     "enabled": False,
-    "username": os.getenv("SMARTPROXY_USERNAME"),
-    "password": os.getenv("SMARTPROXY_PASSWORD"), 
+    "username": _ENV["SMARTPROXY_USERNAME"],
+    "password": _ENV["SMARTPROXY_PASSWORD"], 
     "endpoint": "gate.smartproxy.com:10000"
 }
 
+# Premium providers in priority order: (proxy type, config)
+PREMIUM_PROVIDERS = (
+    ("proxymesh", PROXYMESH_CONFIG),
+    ("bright_data", BRIGHT_DATA_CONFIG),
+    ("smartproxy", SMARTPROXY_CONFIG),
+)
+
 # =============================================================================
 # CONFIGURATION FUNCTIONS
 # =============================================================================
 
+def get_premium_proxy_urls():
+    """
+    Build proxy URLs for every enabled premium provider.
+    
+    Returns:
+        list: (proxy type, proxy URL) tuples in provider priority order
+    """
+    urls = []
+    for proxy_type, config in PREMIUM_PROVIDERS:
+        username = config.get("username")
+        if not (config.get("enabled") and username):
+            continue
+        password = config.get("password")
+        endpoints = config.get("endpoints") or [config["endpoint"]]
+        for endpoint in endpoints:
+            urls.append((proxy_type, f"http://{username}:{password}@{endpoint}"))
+    return urls
+
+def _build_candidates():
+    """
+    Build the proxy URL candidates from the environment and provider configs.
+    
+    Returns:
+        tuple: (YOUTUBE_PROXY or None, tuple of unique premium then public
+        proxy URLs, not repeating YOUTUBE_PROXY)
+    """
+    env_proxy = _ENV["YOUTUBE_PROXY"] or None
+    ranked = dict.fromkeys(url for _, url in get_premium_proxy_urls())
+    ranked.update(dict.fromkeys(PUBLIC_SOCKS_PROXIES))
+    ranked.update(dict.fromkeys(PUBLIC_HTTP_PROXIES))
+    ranked.pop(env_proxy, None)
+    return env_proxy, tuple(ranked)
+
+# Proxy URLs are built once here rather than on every lookup; call
+# rebuild_candidates() after changing the environment or the configs above
+_ENV_PROXY, _CANDIDATES = _build_candidates()
+
+def rebuild_candidates():
+    """
+    Re-read the environment and rebuild the proxy URL candidates.
+    
+    YOUTUBE_PROXY and the premium provider credentials are taken from the
+    current environment; everything else comes from the configs above.
+    """
+    global _ENV_PROXY, _CANDIDATES
+    _ENV.update(_read_env())
+    for proxy_type, config in PREMIUM_PROVIDERS:
+        # Credential variables are named after the provider, e.g. BRIGHT_DATA_USERNAME
+        prefix = proxy_type.upper()
+        config["username"] = _ENV[f"{prefix}_USERNAME"]
+        config["password"] = _ENV[f"{prefix}_PASSWORD"]
+    _ENV_PROXY, _CANDIDATES = _build_candidates()
+
 def get_proxy_url():
     """
     Get the configured proxy URL based on environment and settings.
@@ -70,86 +164,430 @@ def get_proxy_url():
     3. Public proxy list
     4. No proxy (None)
     
+    Among 2 and 3, tested proxies are picked at random, weighted towards
+    those that are fast and have been passing tests (see test_proxies).
+    
     Returns:
         str or None: Proxy URL or None if no proxy configured
     """
     
     # Check environment variable first
-    env_proxy = os.getenv("YOUTUBE_PROXY")
-    if env_proxy:
-        return env_proxy
-    
-    # Check premium proxy services
-    if PROXYMESH_CONFIG["enabled"] and PROXYMESH_CONFIG["username"]:
-        endpoint = PROXYMESH_CONFIG["endpoints"][0]
-        username = PROXYMESH_CONFIG["username"]
-        password = PROXYMESH_CONFIG["password"]
-        return f"http://{username}:{password}@{endpoint}"
-    
-    if BRIGHT_DATA_CONFIG["enabled"] and BRIGHT_DATA_CONFIG["username"]:
-        endpoint = BRIGHT_DATA_CONFIG["endpoint"]
-        username = BRIGHT_DATA_CONFIG["username"]
-        password = BRIGHT_DATA_CONFIG["password"]
-        return f"http://{username}:{password}@{endpoint}"
-    
-    if SMARTPROXY_CONFIG["enabled"] and SMARTPROXY_CONFIG["username"]:
-        endpoint = SMARTPROXY_CONFIG["endpoint"]
-        username = SMARTPROXY_CONFIG["username"]
-        password = SMARTPROXY_CONFIG["password"]
-        return f"http://{username}:{password}@{endpoint}"
-    
-    # Try public proxies (if any are configured)
-    if PUBLIC_SOCKS_PROXIES:
-        return PUBLIC_SOCKS_PROXIES[0]
-    
-    if PUBLIC_HTTP_PROXIES:
-        return PUBLIC_HTTP_PROXIES[0]
-    
-    # No proxy configured
-    return None
+    if _ENV_PROXY:
+        return _ENV_PROXY
+    
+    # Premium proxy services, then public proxies (if any are configured)
+    if not _CANDIDATES:
+        # No proxy configured
+        return None
+    
+    return _pick_proxy(_CANDIDATES)
 
-def test_proxy(proxy_url):
+def refresh_proxy():
     """
-    Test if a proxy is working by making a simple request.
+    Re-read the proxy settings from the environment and configs.
+    
+    Needed after changing YOUTUBE_PROXY or the provider credential variables
+    once this module has been imported.
+    """
+    rebuild_candidates()
+
+def get_all_candidate_proxies():
+    """
+    List every configured proxy URL.
+    
+    Returns:
+        list: Unique proxy URLs in the same priority order get_proxy_url uses
+    """
+    if _ENV_PROXY:
+        return [_ENV_PROXY, *_CANDIDATES]
+    return list(_CANDIDATES)
+
+# Weight of the newest latency sample in the moving average
+LATENCY_EWMA_ALPHA = 0.3
+# Consecutive failures after which a proxy's circuit breaker opens
+MAX_PROXY_FAILURES = 3
+# Seconds an open breaker skips its proxy; doubled each time it fails again, up to the max
+BREAKER_COOLDOWN = 30.0
+BREAKER_MAX_COOLDOWN = 600.0
+# Health weight multipliers applied after each failed or passed test (weight stays <= 1)
+FAILURE_WEIGHT_FACTOR = 0.5
+SUCCESS_WEIGHT_FACTOR = 1.1
+
+@dataclass(slots=True)
+class Breaker:
+    """
+    Circuit breaker for one proxy endpoint.
+    
+    After MAX_PROXY_FAILURES consecutive failures the breaker opens and the
+    proxy is skipped for cooldown seconds. Once that passes it is half-open:
+    a single trial request is let through (see try_acquire), and while it
+    is out the proxy stays skipped. A success closes the breaker, while
+    another failure reopens it with twice the cooldown. A trial that never
+    reports back is given up on after another cooldown.
+    """
+    fail_count: int = 0
+    opened_at: float = 0
+    cooldown: float = BREAKER_COOLDOWN
+    trial_started: float = 0
+    
+    def is_closed(self) -> bool:
+        """Check if the proxy is healthy, i.e. neither open nor half-open."""
+        return self.fail_count < MAX_PROXY_FAILURES
+    
+    def is_open(self) -> bool:
+        """Check if the proxy should currently be skipped."""
+        if self.fail_count < MAX_PROXY_FAILURES:
+            return False
+        now = time.time()
+        return now - self.opened_at < self.cooldown or now - self.trial_started < self.cooldown
+    
+    def try_acquire(self) -> bool:
+        """Check if a request may use the proxy now, claiming the half-open trial if so."""
+        if self.is_open():
+            return False
+        if self.fail_count >= MAX_PROXY_FAILURES:
+            self.trial_started = time.time()
+        return True
+    
+    def record_failure(self) -> None:
+        """Count a failure, opening or reopening the breaker if needed."""
+        now = time.time()
+        self.fail_count += 1
+        if self.fail_count == MAX_PROXY_FAILURES:
+            self.opened_at = now
+        elif self.fail_count > MAX_PROXY_FAILURES and now - self.opened_at >= self.cooldown:
+            # Failed its half-open trial; failures while still open don't extend it
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+            self.opened_at = now
+    
+    def record_success(self) -> None:
+        """Close the breaker and reset its cooldown."""
+        self.fail_count = 0
+        self.cooldown = BREAKER_COOLDOWN
+
+# Health of tested proxies: URL -> {"ewma_ms", "weight", "last"}, and their
+# circuit breakers; both are fed by proxy tests and record_failure/record_success
+_proxy_stats = {}
+_breakers = {}
+_proxy_stats_lock = threading.Lock()
+
+def _is_tripped(proxy_url):
+    """Check if a proxy's breaker is open. Call with _proxy_stats_lock held."""
+    breaker = _breakers.get(proxy_url)
+    return breaker is not None and breaker.is_open()
+
+def _is_closed(proxy_url):
+    """Check if a proxy's breaker is closed. Call with _proxy_stats_lock held."""
+    breaker = _breakers.get(proxy_url)
+    return breaker is None or breaker.is_closed()
+
+def acquire_proxy(proxy_url):
+    """
+    Check if a request may go through a proxy now.
+    
+    Call this right before actually using the proxy: if its breaker is
+    half-open this claims the one trial request it allows.
+    """
+    with _proxy_stats_lock:
+        breaker = _breakers.get(proxy_url)
+        return breaker is None or breaker.try_acquire()
+
+def record_failure(proxy_url):
+    """Report that a request through a proxy failed to connect."""
+    _record_proxy_result(proxy_url, False, None)
+
+def record_success(proxy_url):
+    """Report that a request through a proxy went through."""
+    _record_proxy_result(proxy_url, True, None)
+
+def _record_proxy_result(proxy_url, working, latency_ms):
+    """
+    Update a proxy's weight and breaker, and its latency average when
+    latency_ms is given, after a test or a real request.
+    """
+    with _proxy_stats_lock:
+        stats = _proxy_stats.setdefault(proxy_url, {"ewma_ms": None, "weight": 1.0, "last": 0.0})
+        breaker = _breakers.setdefault(proxy_url, Breaker())
+        stats["last"] = time.time()
+        if not working:
+            breaker.record_failure()
+            stats["weight"] *= FAILURE_WEIGHT_FACTOR
+        else:
+            breaker.record_success()
+            stats["weight"] = min(1.0, stats["weight"] * SUCCESS_WEIGHT_FACTOR)
+            if latency_ms is not None:
+                if stats["ewma_ms"] is None:
+                    stats["ewma_ms"] = latency_ms
+                else:
+                    stats["ewma_ms"] += LATENCY_EWMA_ALPHA * (latency_ms - stats["ewma_ms"])
+
+def _pick_proxy(candidates):
+    """
+    Choose a proxy at random, weighted by health and measured latency.
+    
+    Each tested proxy's weight is its health weight (halved on every failed
+    test, regained on passes) scaled by how close it is to the fastest
+    one, so traffic is spread across the recently fast proxies instead of
+    always going to a single one. Only proxies whose breaker is closed are
+    picked: the caller never reports back, so half-open trials are left to
+    try_with_chain and sticky sessions, which do. Until some healthy proxy
+    has been measured this is the first healthy candidate in configuration
+    order.
+    
+    Args:
+        candidates (tuple): Proxy URLs in configuration order
+        
+    Returns:
+        str: Chosen proxy URL
+    """
+    with _proxy_stats_lock:
+        healthy = [url for url in candidates if _is_closed(url)]
+        if not healthy:
+            # Everything is failing; fall back to configuration order
+            return candidates[0]
+        
+        measured = [url for url in healthy if _proxy_stats.get(url, {}).get("ewma_ms") is not None]
+        if measured:
+            fastest = max(min(_proxy_stats[url]["ewma_ms"] for url in measured), 1.0)
+            weights = [
+                _proxy_stats[url]["weight"] * fastest / max(_proxy_stats[url]["ewma_ms"], 1.0)
+                for url in measured
+            ]
+            chosen = random.choices(measured, weights=weights)[0]
+        else:
+            chosen = healthy[0]
+    return chosen
+
+def get_proxy_chain():
+    """
+    List configured proxies in the order they should be tried.
+    
+    YOUTUBE_PROXY comes first, then the premium and public proxies sorted by
+    health: measured ones fastest first, then untested ones in configuration
+    order, then the ones whose breaker is open.
+    
+    Returns:
+        list: Unique proxy URLs, best first
+    """
+    def health(url):
+        stats = _proxy_stats.get(url, {})
+        ewma = stats.get("ewma_ms")
+        return (_is_tripped(url),
+                float("inf") if ewma is None else ewma)
+    
+    with _proxy_stats_lock:
+        # sorted() is stable, so untested proxies keep their configured order
+        ranked = sorted(_CANDIDATES, key=health)
+    if _ENV_PROXY:
+        ranked.insert(0, _ENV_PROXY)
+    return ranked
+
+class ProxyUnreachable(Exception):
+    """Raised by try_with_chain callbacks when the proxy itself could not be used."""
+
+# Connection-level failures that mean "try the next proxy" rather than "give up"
+PROXY_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ProxyUnreachable,
+)
+
+# yt-dlp error output that points at the proxy rather than the video
+YTDLP_PROXY_ERROR_MARKERS = (
+    "unable to connect to proxy",
+    "proxyerror",
+    "tunnel connection failed",
+    "connection refused",
+    "timed out",
+)
+
+def is_proxy_error(message):
+    """Check if a yt-dlp error message is a proxy connection failure."""
+    message = message.lower()
+    return any(marker in message for marker in YTDLP_PROXY_ERROR_MARKERS)
+
+def try_with_chain(fn, chain=None, per_try_timeout=5):
+    """
+    Call fn with each proxy in turn until one connects.
+    
+    Only connection failures (PROXY_ERRORS) move on to the next proxy, each
+    costing at most per_try_timeout seconds; any other error is raised
+    straight away. Proxies whose breaker is open are skipped, unless that
+    would leave nothing to try. Every proxy used is recorded as a success or
+    failure, which feeds its health weight and circuit breaker.
+    
+    Args:
+        fn (callable): Called as fn(proxy_url, timeout); should raise
+            ProxyUnreachable (or a requests connection error) if the proxy failed
+        chain (list): Proxy URLs to try, get_proxy_chain() by default
+        per_try_timeout (float): Timeout in seconds to pass to each attempt
+        
+    Returns:
+        The first successful result of fn, or fn(None, timeout) if no proxy is configured
+    """
+    if chain is None:
+        chain = get_proxy_chain()
+    if not chain:
+        return fn(None, per_try_timeout)
+    
+    def attempt(proxy_url):
+        result = fn(proxy_url, per_try_timeout)
+        record_success(proxy_url)
+        return result
+    
+    last_error = None
+    for proxy_url in chain:
+        if not acquire_proxy(proxy_url):
+            continue
+        try:
+            return attempt(proxy_url)
+        except PROXY_ERRORS as e:
+            record_failure(proxy_url)
+            last_error = e
+    
+    if last_error is None:
+        # Every breaker is open; the best-ranked proxy is still better than nothing
+        try:
+            return attempt(chain[0])
+        except PROXY_ERRORS:
+            record_failure(chain[0])
+            raise
+    raise last_error
+
+# Endpoint requested through each proxy when testing it
+PROXY_TEST_URL = 'http://httpbin.org/ip'
+
+# Connection pools for proxy tests, one manager per proxy, so repeated checks
+# of the same proxy reuse its connection instead of opening a new one each time
+_proxy_managers = {}
+_proxy_managers_lock = threading.Lock()
+
+def _get_proxy_manager(proxy_url):
+    """Get the urllib3 manager for a proxy, creating it on first use."""
+    with _proxy_managers_lock:
+        manager = _proxy_managers.get(proxy_url)
+        if manager is None:
+            timeout = urllib3.Timeout(connect=3, read=7)
+            if proxy_url.startswith("socks"):
+                # Needs PySocks, like SOCKS proxies do with requests
+                from urllib3.contrib.socks import SOCKSProxyManager
+                manager = SOCKSProxyManager(proxy_url, num_pools=16, maxsize=32, timeout=timeout)
+            else:
+                # ProxyManager does not take credentials from the URL itself
+                auth = urllib3.util.parse_url(proxy_url).auth
+                proxy_headers = urllib3.make_headers(proxy_basic_auth=auth) if auth else None
+                manager = urllib3.ProxyManager(
+                    proxy_url, num_pools=16, maxsize=32, timeout=timeout,
+                    proxy_headers=proxy_headers, cert_reqs="CERT_NONE",
+                )
+            _proxy_managers[proxy_url] = manager
+        return manager
+
+# Recent proxy test results: URL -> (time.monotonic(), working, detail)
+_test_cache = {}
+# Seconds a test result is reused before the proxy is tested again
+TEST_CACHE_TTL = 60
+
+def invalidate_test_cache():
+    """Forget cached proxy test results so the next tests hit the network."""
+    _test_cache.clear()
+
+def _check_proxy(proxy_url):
+    """
+    Test a proxy, reusing its result if it was tested in the last TEST_CACHE_TTL seconds.
     
     Args:
         proxy_url (str): Proxy URL to test
         
     Returns:
-        bool: True if proxy is working, False otherwise
+        tuple: (working, detail) where detail is the exit IP or the failure reason
     """
-    import requests
-    import urllib3
-    from urllib3.exceptions import InsecureRequestWarning
+    cached = _test_cache.get(proxy_url)
+    if cached and time.monotonic() - cached[0] < TEST_CACHE_TTL:
+        return cached[1], cached[2]
     
-    # Disable SSL warnings for proxy testing
-    urllib3.disable_warnings(InsecureRequestWarning)
+    working, detail = _request_through_proxy(proxy_url)
+    _test_cache[proxy_url] = (time.monotonic(), working, detail)
+    return working, detail
+
+def _request_through_proxy(proxy_url):
+    """
+    Make a test request through a proxy.
     
+    Args:
+        proxy_url (str): Proxy URL to test
+        
+    Returns:
+        tuple: (working, detail) where detail is the exit IP or the failure reason
+    """
     try:
-        proxies = {
-            'http': proxy_url,
-            'https': proxy_url
-        }
+        manager = _get_proxy_manager(proxy_url)
         
-        # Test with a simple request
-        response = requests.get(
-            'http://httpbin.org/ip',
-            proxies=proxies,
-            timeout=10,
-            verify=False
-        )
+        # Test with a simple request; a failed test should fail, not retry
+        started = time.perf_counter()
+        response = manager.request("GET", PROXY_TEST_URL, retries=False)
+        latency_ms = (time.perf_counter() - started) * 1000
         
-        if response.status_code == 200:
-            print(f"✅ Proxy working: {proxy_url}")
-            print(f"   IP: {response.json().get('origin', 'Unknown')}")
-            return True
-        else:
-            print(f"❌ Proxy failed: {proxy_url} (Status: {response.status_code})")
-            return False
+        if response.status == 200:
+            _record_proxy_result(proxy_url, True, latency_ms)
+            return True, _json_loads(response.data).get('origin', 'Unknown')
+        _record_proxy_result(proxy_url, False, latency_ms)
+        return False, f"Status: {response.status}"
             
     except Exception as e:
-        print(f"❌ Proxy failed: {proxy_url} (Error: {e})")
-        return False
+        _record_proxy_result(proxy_url, False, None)
+        return False, f"Error: {e}"
+
+def _report_proxy(proxy_url, working, detail):
+    """Print the result of a proxy test."""
+    if working:
+        print(f"✅ Proxy working: {proxy_url}")
+        print(f"   IP: {detail}")
+    else:
+        print(f"❌ Proxy failed: {proxy_url} ({detail})")
+
+def test_proxy(proxy_url):
+    """
+    Test if a proxy is working by making a simple request.
+    
+    Args:
+        proxy_url (str): Proxy URL to test
+        
+    Returns:
+        bool: True if proxy is working, False otherwise
+    """
+    working, detail = _check_proxy(proxy_url)
+    _report_proxy(proxy_url, working, detail)
+    return working
+
+def test_proxies(proxy_urls, max_workers=32):
+    """
+    Test several proxies concurrently.
+    
+    Each test mostly waits on the network, so running them in parallel takes
+    about as long as the slowest one instead of the sum of all of them.
+    
+    Args:
+        proxy_urls (list): Proxy URLs to test
+        max_workers (int): Maximum number of tests in flight
+        
+    Returns:
+        dict: Proxy URL -> True if the proxy is working
+    """
+    # Each proxy is tested and scored once, however often it is listed
+    proxy_urls = list(dict.fromkeys(proxy_urls))
+    if not proxy_urls:
+        return {}
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(proxy_urls))) as executor:
+        futures = {executor.submit(_check_proxy, url): url for url in proxy_urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            working, detail = future.result()
+            _report_proxy(url, working, detail)
+            results[url] = working
+    return results
 
 # =============================================================================
 # SETUP INSTRUCTIONS
@@ -209,11 +647,11 @@ if __name__ == "__main__":
     print("Proxy Configuration Test")
     print("=" * 50)
     
-    proxy = get_proxy_url()
-    if proxy:
-        print(f"Configured proxy: {proxy}")
-        print("Testing proxy...")
-        test_proxy(proxy)
+    proxies = get_all_candidate_proxies()
+    if proxies:
+        print(f"Configured proxy: {get_proxy_url()}")
+        print(f"Testing {len(proxies)} configured proxies...")
+        test_proxies(proxies)
     else:
         print("No proxy configured.")
         print("\n" + SETUP_INSTRUCTIONS)
@@ -20,18 +20,27 @@ import sqlite3
 import threading
 from queue import Queue
 
+from proxy_config import (
+    PROXY_ERRORS, ProxyUnreachable, acquire_proxy, get_proxy_chain, is_proxy_error, try_with_chain
+)
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# yt-dlp socket timeout per proxy when rotating through the proxy chain, so a
+# dead proxy costs seconds rather than the default 30s per attempt
+PROXY_TRY_TIMEOUT = 10
+
+@dataclass(slots=True)
 class RequestMetrics:
     """Track request metrics per session."""
     session_id: str
     request_count: int = 0
     last_request_time: float = 0
     backoff_until: float = 0
+    next_slot_time: float = 0
     user_agent_index: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class StickySession:
     """Track sticky session information for workers."""
     worker_id: str
@@ -61,9 +70,10 @@ class ProxyThrottler:
     def get_session_metrics(self, session_id: str) -> RequestMetrics:
         """Get or create session metrics."""
         with self.lock:
-            if session_id not in self.sessions:
-                self.sessions[session_id] = RequestMetrics(session_id=session_id)
-            return self.sessions[session_id]
+            metrics = self.sessions.get(session_id)
+            if metrics is None:
+                metrics = self.sessions[session_id] = RequestMetrics(session_id=session_id)
+            return metrics
     
     def should_throttle(self, session_id: str) -> tuple[bool, float]:
         """Check if request should be throttled and return wait time."""
@@ -100,9 +110,27 @@ class ProxyThrottler:
                 logger.warning(f"Session {session_id}: 429 detected, backing off for {backoff_seconds}s")
     
     def wait_if_needed(self, session_id: str):
-        """Wait if throttling is needed."""
-        should_wait, wait_time = self.should_throttle(session_id)
-        if should_wait:
+        """
+        Wait if throttling is needed.
+        
+        The caller's start time is reserved under the lock, so concurrent callers
+        sharing a session are spaced min_interval apart and each sleeps exactly
+        once until its slot instead of all waking and firing together.
+        """
+        metrics = self.get_session_metrics(session_id)
+        
+        with self.lock:
+            current_time = time.time()
+            start_time = max(
+                current_time,
+                metrics.backoff_until,
+                metrics.next_slot_time,
+                metrics.last_request_time + self.min_interval if metrics.last_request_time > 0 else 0,
+            )
+            metrics.next_slot_time = start_time + self.min_interval
+        
+        wait_time = start_time - current_time
+        if wait_time > 0:
             logger.info(f"Session {session_id}: Throttling request, waiting {wait_time:.2f}s")
             time.sleep(wait_time)
 
@@ -178,11 +206,38 @@ class VideoCache:
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
         self.db_path = os.path.join(cache_dir, "video_cache.db")
+        self._local = threading.local()
+        # Every thread's connection, so close() can release them all at shutdown
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's cache connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only this thread uses the connection; the flag lets close() run elsewhere
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL lets readers proceed during writes; NORMAL sync is safe with WAL
+            # and avoids an fsync per commit for what is only a cache
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+    
+    def close(self):
+        """Close every thread's cache connection; threads reconnect on next use."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for conn in conns:
+            conn.close()
+    
     def _init_db(self):
         """Initialize SQLite cache database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.execute("""
             CREATE TABLE IF NOT EXISTS video_cache (
                 video_id TEXT PRIMARY KEY,
@@ -201,40 +256,37 @@ class VideoCache:
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_video_etag ON video_cache(video_id, etag)
         """)
+        # cleanup_old_cache deletes by last_accessed; without this it scans the table
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_video_last_accessed ON video_cache(last_accessed)
+        """)
         conn.commit()
-        conn.close()
     
     def get_cached_video(self, video_id: str, etag: str = None) -> Optional[Dict[str, Any]]:
         """Get cached video data if available and valid."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connect()
         
-        query = "SELECT * FROM video_cache WHERE video_id = ?"
+        # Update last accessed and read the row back in the same statement
+        query = "UPDATE video_cache SET last_accessed = CURRENT_TIMESTAMP WHERE video_id = ?"
         params = [video_id]
         
         if etag:
             query += " AND etag = ?"
             params.append(etag)
         
-        cursor.execute(query, params)
-        row = cursor.fetchone()
+        cursor = conn.execute(query + " RETURNING *", params)
+        rows = cursor.fetchall()
+        conn.commit()
         
-        if row:
-            # Update last accessed
-            conn.execute("UPDATE video_cache SET last_accessed = CURRENT_TIMESTAMP WHERE video_id = ?", [video_id])
-            conn.commit()
-            
+        if rows:
             columns = [description[0] for description in cursor.description]
-            result = dict(zip(columns, row))
-            conn.close()
-            return result
+            return dict(zip(columns, rows[0]))
         
-        conn.close()
         return None
     
     def cache_video(self, video_id: str, etag: str, **kwargs):
         """Cache video metadata and transcription."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         
         # Prepare data
         data = {
@@ -249,12 +301,23 @@ class VideoCache:
             'transcription_vtt': kwargs.get('transcription_vtt')
         }
         
-        # Insert or replace
+        # Upsert in one statement; unlike INSERT OR REPLACE this updates the
+        # row in place instead of deleting and reinserting it, keeping created_at
         conn.execute("""
-            INSERT OR REPLACE INTO video_cache 
+            INSERT INTO video_cache 
             (video_id, etag, title, duration, captions_available, audio_cached, 
              transcription_text, transcription_srt, transcription_vtt)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(video_id) DO UPDATE SET
+                etag = excluded.etag,
+                title = excluded.title,
+                duration = excluded.duration,
+                captions_available = excluded.captions_available,
+                audio_cached = excluded.audio_cached,
+                transcription_text = excluded.transcription_text,
+                transcription_srt = excluded.transcription_srt,
+                transcription_vtt = excluded.transcription_vtt,
+                last_accessed = CURRENT_TIMESTAMP
         """, [
             data['video_id'], data['etag'], data['title'], data['duration'],
             data['captions_available'], data['audio_cached'], 
@@ -262,15 +325,13 @@ class VideoCache:
         ])
         
         conn.commit()
-        conn.close()
     
     def cleanup_old_cache(self, days: int = 7):
         """Remove cache entries older than specified days."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cutoff_date = datetime.now() - timedelta(days=days)
         conn.execute("DELETE FROM video_cache WHERE last_accessed < ?", [cutoff_date])
         conn.commit()
-        conn.close()
 
 class CaptionsExtractor:
     """Extracts captions using YouTube's captions API to save bandwidth."""
@@ -289,37 +350,52 @@ class CaptionsExtractor:
             
             # Create temporary directory for captions
             with tempfile.TemporaryDirectory() as temp_dir:
-                cmd = [
-                    'yt-dlp',
-                    '--write-subs',
-                    '--write-auto-subs',
-                    '--sub-langs', f'{language}.*',
-                    '--sub-format', 'vtt/srt/best',
-                    '--skip-download',  # Don't download video/audio
-                    '--output', os.path.join(temp_dir, '%(id)s.%(ext)s'),
-                ]
-                
-                # Add proxy and headers
-                proxy_url = self.proxy_manager.get_proxy_url()
-                if proxy_url:
-                    cmd.extend(['--proxy', proxy_url])
-                
                 headers = self.proxy_manager.user_agent_rotator.get_headers("captions")
-                cmd.extend(['--user-agent', headers['User-Agent']])
-                
-                cmd.append(f'https://youtube.com/watch?v={video_id}')
-                
-                # Throttle the request
-                self.proxy_manager.throttler.wait_if_needed("captions")
                 
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+                def run_yt_dlp(proxy_url, timeout):
+                    cmd = [
+                        'yt-dlp',
+                        '--write-subs',
+                        '--write-auto-subs',
+                        '--sub-langs', f'{language}.*',
+                        '--sub-format', 'vtt/srt/best',
+                        '--skip-download',  # Don't download video/audio
+                        '--socket-timeout', str(timeout),
+                        '--output', os.path.join(temp_dir, '%(id)s.%(ext)s'),
+                    ]
+                    
+                    # Add proxy and headers
+                    if proxy_url:
+                        cmd.extend(['--proxy', proxy_url])
+                    cmd.extend(['--user-agent', headers['User-Agent']])
+                    
+                    cmd.append(f'https://youtube.com/watch?v={video_id}')
+                    
+                    # Throttle the request
+                    self.proxy_manager.throttler.wait_if_needed("captions")
+                    
+                    try:
+                        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+                    except subprocess.TimeoutExpired as e:
+                        self.proxy_manager.throttler.record_request("captions", success=False, status_code=504)
+                        if proxy_url:
+                            # A hung proxy is a dead proxy: count it against its breaker and try the next one
+                            raise ProxyUnreachable(f"yt-dlp timed out after {e.timeout}s through {proxy_url}") from e
+                        raise
+                    
+                    # Record the request
+                    self.proxy_manager.throttler.record_request(
+                        "captions", 
+                        success=(result.returncode == 0),
+                        status_code=200 if result.returncode == 0 else 500
+                    )
+                    
+                    if result.returncode != 0 and proxy_url and is_proxy_error(result.stderr or ''):
+                        raise ProxyUnreachable(result.stderr.strip())
+                    return result
                 
-                # Record the request
-                self.proxy_manager.throttler.record_request(
-                    "captions", 
-                    success=(result.returncode == 0),
-                    status_code=200 if result.returncode == 0 else 500
-                )
+                # A dead proxy moves on to the next one in the chain
+                result = try_with_chain(run_yt_dlp, per_try_timeout=PROXY_TRY_TIMEOUT)
                 
                 if result.returncode == 0:
                     # Find and read caption file
@@ -380,8 +456,8 @@ class StickySessionManager:
         """Load available proxy configurations."""
         try:
             from proxy_config import (
-                PROXYMESH_CONFIG, BRIGHT_DATA_CONFIG, SMARTPROXY_CONFIG,
-                PUBLIC_SOCKS_PROXIES, PUBLIC_HTTP_PROXIES, get_proxy_url
+                PUBLIC_SOCKS_PROXIES, PUBLIC_HTTP_PROXIES,
+                get_premium_proxy_urls, get_proxy_url
             )
             
             # Add environment proxy
@@ -394,29 +470,9 @@ class StickySessionManager:
                 })
             
             # Add premium proxies
-            if PROXYMESH_CONFIG.get('enabled') and PROXYMESH_CONFIG.get('username'):
-                for endpoint in PROXYMESH_CONFIG.get('endpoints', []):
-                    proxy_url = f"http://{PROXYMESH_CONFIG['username']}:{PROXYMESH_CONFIG['password']}@{endpoint}"
-                    self.proxy_configs.append({
-                        'type': 'proxymesh',
-                        'url': proxy_url,
-                        'priority': 2
-                    })
-            
-            if BRIGHT_DATA_CONFIG.get('enabled') and BRIGHT_DATA_CONFIG.get('username'):
-                endpoint = BRIGHT_DATA_CONFIG['endpoint']
-                proxy_url = f"http://{BRIGHT_DATA_CONFIG['username']}:{BRIGHT_DATA_CONFIG['password']}@{endpoint}"
+            for proxy_type, proxy_url in get_premium_proxy_urls():
                 self.proxy_configs.append({
-                    'type': 'bright_data',
-                    'url': proxy_url,
-                    'priority': 2
-                })
-            
-            if SMARTPROXY_CONFIG.get('enabled') and SMARTPROXY_CONFIG.get('username'):
-                endpoint = SMARTPROXY_CONFIG['endpoint']
-                proxy_url = f"http://{SMARTPROXY_CONFIG['username']}:{SMARTPROXY_CONFIG['password']}@{endpoint}"
-                self.proxy_configs.append({
-                    'type': 'smartproxy',
+                    'type': proxy_type,
                     'url': proxy_url,
                     'priority': 2
                 })
@@ -471,8 +527,8 @@ class StickySessionManager:
         
         with self.lock:
             # Check if worker already has a valid session
-            if worker_id in self.sessions:
-                session = self.sessions[worker_id]
+            session = self.sessions.get(worker_id)
+            if session is not None:
                 if not session.is_expired(self.session_duration) and not session.is_stale():
                     # Update last used time
                     session.last_used_time = time.time()
@@ -490,9 +546,15 @@ class StickySessionManager:
             # Select proxy for this session (round-robin or random)
             proxy_url = None
             if self.proxy_configs:
-                # Use hash of worker_id to get consistent proxy selection
+                # Use hash of worker_id to get consistent proxy selection,
+                # moving on to the next proxy while the chosen one's breaker is open
                 proxy_index = hash(worker_id + str(int(current_time // self.session_duration))) % len(self.proxy_configs)
                 proxy_url = self.proxy_configs[proxy_index]['url']
+                for offset in range(len(self.proxy_configs)):
+                    config = self.proxy_configs[(proxy_index + offset) % len(self.proxy_configs)]
+                    if acquire_proxy(config['url']):
+                        proxy_url = config['url']
+                        break
             
             # Create new sticky session
             session = StickySession(
@@ -619,6 +681,34 @@ class ProxyManager:
         
         return None
     
+    def download_audio(self, url: str, output_dir: str, worker_id: str) -> Optional[str]:
+        """
+        Download audio through the worker's sticky proxy.
+        
+        If that proxy can't be reached the rest of the proxy chain is tried,
+        and the proxy that worked becomes the worker's sticky proxy.
+        
+        Returns:
+            Path to the downloaded audio file, or None if the download failed
+        """
+        from standalone_whisper import download_audio_from_youtube
+        
+        session = self.get_worker_session(worker_id)
+        chain = get_proxy_chain()
+        if session.proxy_url:
+            chain = [session.proxy_url] + [proxy for proxy in chain if proxy != session.proxy_url]
+        
+        def attempt(proxy_url, timeout):
+            audio_file = download_audio_from_youtube(url, output_dir, proxy_url, socket_timeout=timeout)
+            session.proxy_url = proxy_url
+            return audio_file
+        
+        try:
+            return try_with_chain(attempt, chain, per_try_timeout=PROXY_TRY_TIMEOUT)
+        except PROXY_ERRORS as e:
+            logger.error(f"Worker {worker_id}: no proxy could be reached for {url}: {e}")
+            return None
+    
     def get_download_options(self, worker_id: str) -> List[str]:
         """Get yt-dlp options with sticky session proxy and throttling."""
         # Get sticky session for this worker
@@ -690,6 +780,10 @@ class ProxyManager:
     def cleanup_cache(self, days: int = 7):
         """Clean up old cache entries."""
         self.cache.cleanup_old_cache(days)
+    
+    def close(self):
+        """Release the cache's database connections."""
+        self.cache.close()
 
 # Global proxy manager instance
 _proxy_manager = None
@@ -701,6 +795,11 @@ def get_proxy_manager() -> ProxyManager:
         _proxy_manager = ProxyManager()
     return _proxy_manager
 
+def close_proxy_manager():
+    """Close the global proxy manager, if one was created."""
+    if _proxy_manager is not None:
+        _proxy_manager.close()
+
 # Example usage and testing
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -5,6 +5,7 @@ Serves static files and handles transcription requests with real Whisper integra
 """
 
 import os
+import re
 import sys
 import uuid
 import logging
@@ -12,9 +13,15 @@ import json
 import time
 import threading
 import queue
+import shutil
 import tempfile
+import atexit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, Response, send_from_directory
+from flask import Flask, render_template, request, jsonify, Response, send_file, send_from_directory
+
+from transcription_files import UNSAFE_FILENAME_CHARS_RE, save_transcription_formats
 
 # Setup basic logging first
 logging.basicConfig(level=logging.INFO)
@@ -48,7 +55,7 @@ except Exception as e:
 
 # Try to import the advanced proxy manager
 try:
-    from proxy_manager import get_proxy_manager
+    from proxy_manager import close_proxy_manager, get_proxy_manager
     PROXY_MANAGER_AVAILABLE = True
     logger.info("✅ Advanced proxy manager loaded successfully")
 except Exception as e:
@@ -57,15 +64,132 @@ except Exception as e:
     PROXY_MANAGER_AVAILABLE = False
 
 # Create Flask app
+# Static assets are served from the site root by Flask's built-in static route
 app = Flask(__name__, 
             static_folder='static',
+            static_url_path='',
             template_folder='templates')
 
-# Create necessary directories
-os.makedirs('tmp', exist_ok=True)
+# Let browsers reuse static assets instead of refetching them on every page
+# load; conditional requests still revalidate with ETag/Last-Modified
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = int(os.environ.get('STATIC_MAX_AGE', 3600))
+
+# Behind nginx/Apache with X-Sendfile support, hand static files and downloads
+# to the front-end server instead of streaming them through Python. Leave off
+# when running standalone: Werkzeug would send the header with an empty body.
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# jsonify sorts keys by default, which is wasted work on every status poll
+app.json.sort_keys = False
+
+# Temporary storage for job statuses, oldest first (bounded so finished jobs don't pile up).
+# Workers look up their job's dict once and update it in place, so a running job
+# keeps working even if its entry is evicted here
+job_statuses = OrderedDict()
+job_statuses_lock = threading.Lock()
+MAX_JOB_STATUSES = int(os.environ.get('MAX_JOB_STATUSES', 10000))
+
+def register_job(job_id, status):
+    """Store the initial status of a new job, evicting the oldest jobs beyond MAX_JOB_STATUSES"""
+    status.setdefault('created_at', time.time())
+    start_scratch_sweeper()
+    with job_statuses_lock:
+        job_statuses[job_id] = status
+        job_statuses.move_to_end(job_id)
+        while len(job_statuses) > MAX_JOB_STATUSES:
+            job_statuses.popitem(last=False)
+
+# Single-video jobs still in progress by (video_id, mode, lang), so identical
+# concurrent requests share one job instead of running Whisper twice.
+# Lock order: pending_jobs_lock may be held while taking job_statuses_lock, never the reverse
+pending_jobs = {}
+pending_jobs_lock = threading.Lock()
+
+# Background transcription jobs share a bounded pool instead of one thread per request
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', 4))
+job_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix='transcribe')
+# Playlist jobs prefetch the next video's audio here while the current one is transcribed
+download_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix='download')
+
+# The pools' worker threads are joined before atexit handlers run, so the video
+# cache's per-thread SQLite connections are idle by the time they are closed
+if PROXY_MANAGER_AVAILABLE:
+    atexit.register(close_proxy_manager)
+
+# Downloaded audio and uploads only live until they are transcribed, so keep them
+# in the system temp dir (often tmpfs) rather than next to the saved transcripts.
+# The prefix is specific to this server: the FastAPI app may share the temp dir
+SCRATCH_DIR = os.environ.get('TRANSCRIBE_SCRATCH_DIR') or tempfile.gettempdir()
+SCRATCH_PREFIX = 'videotranscribe_flask_'
+
+# Jobs remove their scratch dirs when done; one of ours older than this whose
+# job is no longer running was leaked by a worker that died mid-job
+SCRATCH_MAX_AGE = int(os.environ.get('SCRATCH_MAX_AGE', 7200))
+SCRATCH_SWEEP_INTERVAL = 600
+
+# Scratch dirs created by this process, by path, with the job that owns them.
+# Only these are ever swept, so other processes' (or servers') dirs are left alone
+scratch_dirs = {}
+scratch_dirs_lock = threading.Lock()
+
+FINISHED_JOB_STATUSES = ('complete', 'error')
+
+def make_scratch_dir(job_id):
+    """Create a private scratch directory for one download or upload of a job"""
+    path = tempfile.mkdtemp(prefix=SCRATCH_PREFIX, dir=SCRATCH_DIR)
+    with scratch_dirs_lock:
+        scratch_dirs[path] = job_id
+    return path
 
-# Temporary storage for job statuses
-job_statuses = {}
+def remove_scratch_dir(path):
+    """Delete a scratch directory and stop tracking it"""
+    shutil.rmtree(path, ignore_errors=True)
+    with scratch_dirs_lock:
+        scratch_dirs.pop(path, None)
+
+def is_job_running(job_id):
+    """Whether a job is still registered and not finished"""
+    job = job_statuses.get(job_id)
+    return job is not None and job.get('status') not in FINISHED_JOB_STATUSES
+
+def sweep_scratch_dirs():
+    """Remove stale scratch directories this process created for jobs that are no longer running"""
+    cutoff = time.time() - SCRATCH_MAX_AGE
+    with scratch_dirs_lock:
+        candidates = list(scratch_dirs.items())
+    for path, job_id in candidates:
+        if is_job_running(job_id):
+            continue
+        try:
+            if os.stat(path).st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            pass  # Already gone; just stop tracking it
+        except OSError:
+            continue  # Unreadable for now; try again next sweep
+        logger.info(f"Removing stale scratch directory: {path}")
+        remove_scratch_dir(path)
+
+def scratch_sweeper():
+    """Sweep scratch directories periodically"""
+    while True:
+        sweep_scratch_dirs()
+        time.sleep(SCRATCH_SWEEP_INTERVAL)
+
+# Started on first use rather than at import, so importing this module (tests,
+# pre-forking servers) has no side effects
+scratch_sweeper_started = False
+scratch_sweeper_lock = threading.Lock()
+
+def start_scratch_sweeper():
+    """Start the scratch sweeper thread once per process"""
+    global scratch_sweeper_started
+    if scratch_sweeper_started:
+        return
+    with scratch_sweeper_lock:
+        if not scratch_sweeper_started:
+            threading.Thread(target=scratch_sweeper, name='scratch-sweeper', daemon=True).start()
+            scratch_sweeper_started = True
 
 # Fallback functions if Whisper service fails to load
 def fallback_transcribe_audio_file(file_path, language=None):
@@ -108,6 +232,10 @@ if not WHISPER_AVAILABLE:
 def real_transcribe_playlist(job_id, playlist_url, mode, lang):
     """Transcribe all videos in a YouTube playlist"""
     try:
+        job = job_statuses.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was evicted or never registered, skipping it")
+            return
         logger.info(f"Starting playlist transcription for job {job_id}")
         
         # Create worker ID for sticky session (playlist jobs get consistent worker ID)
@@ -129,8 +257,8 @@ def real_transcribe_playlist(job_id, playlist_url, mode, lang):
             logger.info(f"Using proxy: {proxy}")
         
         # Update status to extracting playlist
-        job_statuses[job_id]['status'] = 'extracting_playlist'
-        job_statuses[job_id]['percent'] = 5
+        job['status'] = 'extracting_playlist'
+        job['percent'] = 5
         
         # Extract videos from playlist (with throttling if available)
         logger.info(f"Extracting videos from playlist: {playlist_url}")
@@ -146,66 +274,84 @@ def real_transcribe_playlist(job_id, playlist_url, mode, lang):
             raise Exception("No videos found in the playlist or playlist is private/unavailable.")
         
         logger.info(f"Found {len(videos)} videos in playlist")
-        job_statuses[job_id]['total_videos'] = len(videos)
-        job_statuses[job_id]['completed_videos'] = 0
+        job['total_videos'] = len(videos)
+        job['completed_videos'] = 0
         
         # Create save directory
         save_dir = os.path.join('tmp', job_id)
         os.makedirs(save_dir, exist_ok=True)
         
+        def fetch_video(video):
+            """Get a video's transcription from cache/captions, or download its audio for Whisper"""
+            video_id = video.get('id')
+            
+            # Try optimized transcription with proxy manager (using same worker ID for sticky session)
+            if proxy_manager and video_id:
+                logger.info(f"Using optimized transcription for {video['title']} (sticky session: {worker_id})")
+                transcription_result = proxy_manager.get_optimized_transcription(
+                    video_id=video_id,
+                    mode=mode,
+                    language=lang if lang != 'auto' else 'en',
+                    worker_id=worker_id  # Use same worker ID for sticky session
+                )
+                if transcription_result:
+                    return transcription_result, None, None
+            
+            # Fallback to traditional audio download + Whisper
+            logger.info(f"Using traditional audio download for: {video['title']}")
+            
+            # Throttle request using worker ID for sticky session
+            if proxy_manager:
+                proxy_manager.pre_request_hook(worker_id)
+            
+            # Download audio for this video
+            temp_dir = make_scratch_dir(job_id)
+            
+            try:
+                # Use the sticky session proxy, moving along the proxy chain if it's dead
+                if proxy_manager:
+                    audio_file = proxy_manager.download_audio(video['url'], temp_dir, worker_id)
+                else:
+                    audio_file = download_audio_from_youtube(video['url'], temp_dir, proxy)
+            except Exception:
+                # The caller never sees this temp_dir, so clean it up here
+                remove_scratch_dir(temp_dir)
+                raise
+            
+            # Record request result using worker ID
+            if proxy_manager:
+                proxy_manager.post_request_hook(worker_id, success=(audio_file is not None))
+            
+            return None, audio_file, temp_dir
+        
+        # Downloads run one video ahead of transcription, so fetching the next
+        # video's audio overlaps with the Whisper API call for the current one
+        next_fetch = download_executor.submit(fetch_video, videos[0])
+        
         # Process each video
         for i, video in enumerate(videos):
+            audio_file = temp_dir = None
             try:
                 logger.info(f"Processing video {i+1}/{len(videos)}: {video['title']}")
                 
                 # Update progress
                 base_progress = 10 + (i * 80 // len(videos))
-                job_statuses[job_id]['status'] = f'processing_video_{i+1}_of_{len(videos)}'
-                job_statuses[job_id]['percent'] = base_progress
-                job_statuses[job_id]['current_video'] = video['title']
+                job['status'] = f'processing_video_{i+1}_of_{len(videos)}'
+                job['percent'] = base_progress
+                job['current_video'] = video['title']
                 
                 video_id = video.get('id')
-                transcription_result = None
+                current_fetch = next_fetch
+                next_fetch = download_executor.submit(fetch_video, videos[i + 1]) if i + 1 < len(videos) else None
+                transcription_result, audio_file, temp_dir = current_fetch.result()
                 
-                # Try optimized transcription with proxy manager (using same worker ID for sticky session)
-                if proxy_manager and video_id:
-                    logger.info(f"Using optimized transcription for {video['title']} (sticky session: {worker_id})")
-                    transcription_result = proxy_manager.get_optimized_transcription(
-                        video_id=video_id,
-                        mode=mode,
-                        language=lang if lang != 'auto' else 'en',
-                        worker_id=worker_id  # Use same worker ID for sticky session
-                    )
-                
-                # Fallback to traditional audio download + Whisper
                 if not transcription_result:
-                    logger.info(f"Using traditional audio download for: {video['title']}")
-                    
-                    # Throttle request using worker ID for sticky session
-                    if proxy_manager:
-                        proxy_manager.pre_request_hook(worker_id)
-                    
-                    # Download audio for this video
-                    temp_dir = tempfile.mkdtemp(dir='tmp')
-                    
-                    # Use sticky session proxy if available
-                    download_proxy = proxy
-                    if proxy_manager:
-                        session = proxy_manager.get_worker_session(worker_id)
-                        download_proxy = session.proxy_url
-                    
-                    audio_file = download_audio_from_youtube(video['url'], temp_dir, download_proxy)
-                    
-                    # Record request result using worker ID
-                    if proxy_manager:
-                        proxy_manager.post_request_hook(worker_id, success=(audio_file is not None))
-                    
                     if not audio_file:
                         logger.warning(f"Failed to download audio for video: {video['title']}")
                         continue
                     
                     # Update progress
-                    job_statuses[job_id]['percent'] = base_progress + 20
+                    job['percent'] = base_progress + 20
                     
                     # Transcribe using Whisper
                     logger.info(f"Transcribing: {video['title']}")
@@ -221,76 +367,53 @@ def real_transcribe_playlist(job_id, playlist_url, mode, lang):
                             transcription_srt=transcription_result['srt'],
                             transcription_vtt=transcription_result['vtt']
                         )
-                    
-                    # Clean up temporary audio file
-                    try:
-                        if os.path.exists(audio_file):
-                            os.remove(audio_file)
-                        if os.path.exists(temp_dir):
-                            os.rmdir(temp_dir)
-                    except:
-                        pass  # Don't fail if cleanup fails
                 
                 if not transcription_result:
                     logger.warning(f"Failed to transcribe video: {video['title']}")
                     continue
                 
                 # Update progress
-                job_statuses[job_id]['percent'] = base_progress + 60
+                job['percent'] = base_progress + 60
                 
                 # Save files with video title as filename
                 safe_title = video['title'][:100]  # Limit filename length
-                txt_path = os.path.join(save_dir, f"{safe_title}.txt")
-                srt_path = os.path.join(save_dir, f"{safe_title}.srt")
-                vtt_path = os.path.join(save_dir, f"{safe_title}.vtt")
-                
-                # Write text file
-                with open(txt_path, 'w', encoding='utf-8') as f:
-                    f.write(transcription_result['text'])
-                
-                # Write SRT file
-                with open(srt_path, 'w', encoding='utf-8') as f:
-                    f.write(transcription_result['srt'])
-                
-                # Write VTT file
-                with open(vtt_path, 'w', encoding='utf-8') as f:
-                    f.write(transcription_result['vtt'])
-                
-                # Clean up temporary audio file
-                try:
-                    if os.path.exists(audio_file):
-                        os.remove(audio_file)
-                    if os.path.exists(temp_dir):
-                        os.rmdir(temp_dir)
-                except:
-                    pass  # Don't fail if cleanup fails
+                save_transcription_formats(save_dir, safe_title, transcription_result)
                 
                 # Update completed count
-                job_statuses[job_id]['completed_videos'] = i + 1
+                job['completed_videos'] = i + 1
                 logger.info(f"Completed transcription for: {video['title']}")
                 
             except Exception as video_error:
                 logger.error(f"Error processing video {video['title']}: {video_error}")
                 # Continue with next video instead of failing entire playlist
                 continue
+            finally:
+                # Clean up downloaded audio, including any partial yt-dlp files
+                if temp_dir:
+                    remove_scratch_dir(temp_dir)
         
         # Update status to complete
-        job_statuses[job_id]['status'] = 'complete'
-        job_statuses[job_id]['percent'] = 100
+        job['status'] = 'complete'
+        job['percent'] = 100
         
-        completed_count = job_statuses[job_id]['completed_videos']
+        completed_count = job['completed_videos']
         logger.info(f"Completed playlist transcription for job {job_id}: {completed_count}/{len(videos)} videos")
         
     except Exception as e:
         logger.error(f"Error in playlist transcription job {job_id}: {e}")
-        job_statuses[job_id]['status'] = 'error'
-        job_statuses[job_id]['error'] = str(e)
-        job_statuses[job_id]['percent'] = 100
+        job['status'] = 'error'
+        job['error'] = str(e)
+        job['percent'] = 100
 
 # Real transcription function using optimized proxy manager with sticky sessions
 def real_transcribe_audio(job_id, url, mode, lang, video_id):
     """Real transcription function using Whisper and yt-dlp with optimized proxy handling and sticky sessions"""
+    temp_dir = None
     try:
+        job = job_statuses.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was evicted or never registered, skipping it")
+            return
         logger.info(f"Starting real transcription for job {job_id}")
         
         # Create worker ID for sticky session (single jobs get unique worker ID based on job_id)
@@ -312,8 +435,8 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
             logger.info(f"Using proxy: {proxy}")
         
         # Update status to starting
-        job_statuses[job_id]['status'] = 'starting_transcription'
-        job_statuses[job_id]['percent'] = 5
+        job['status'] = 'starting_transcription'
+        job['percent'] = 5
         
         transcription_result = None
         
@@ -328,8 +451,8 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
             )
             
             if transcription_result:
-                job_statuses[job_id]['status'] = 'transcription_complete_captions'
-                job_statuses[job_id]['percent'] = 70
+                job['status'] = 'transcription_complete_captions'
+                job['percent'] = 70
                 logger.info(f"✅ Transcription completed using captions API (saved ~90% bandwidth)")
         
         # Fallback to traditional audio download + Whisper
@@ -337,8 +460,8 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
             logger.info(f"Using traditional audio download + Whisper for video {video_id}")
             
             # Update status to downloading
-            job_statuses[job_id]['status'] = 'downloading_audio'
-            job_statuses[job_id]['percent'] = 10
+            job['status'] = 'downloading_audio'
+            job['percent'] = 10
             
             # Throttle request using worker ID for sticky session
             if proxy_manager:
@@ -346,15 +469,13 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
             
             # Download audio from YouTube
             logger.info(f"Downloading audio for video {video_id} from URL: {url}")
-            temp_dir = tempfile.mkdtemp(dir='tmp')
+            temp_dir = make_scratch_dir(job_id)
             
-            # Use sticky session proxy if available
-            download_proxy = proxy
+            # Use the sticky session proxy, moving along the proxy chain if it's dead
             if proxy_manager:
-                session = proxy_manager.get_worker_session(worker_id)
-                download_proxy = session.proxy_url
-            
-            audio_file = download_audio_from_youtube(url, temp_dir, download_proxy)
+                audio_file = proxy_manager.download_audio(url, temp_dir, worker_id)
+            else:
+                audio_file = download_audio_from_youtube(url, temp_dir, proxy)
             
             # Record request result using worker ID
             if proxy_manager:
@@ -366,8 +487,8 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
             logger.info(f"Audio downloaded successfully: {audio_file}")
             
             # Update status to transcribing
-            job_statuses[job_id]['status'] = 'transcribing_audio'
-            job_statuses[job_id]['percent'] = 40
+            job['status'] = 'transcribing_audio'
+            job['percent'] = 40
             
             # Transcribe using Whisper
             logger.info(f"Transcribing audio with Whisper (mode: {mode}, language: {lang})")
@@ -382,90 +503,62 @@ def real_transcribe_audio(job_id, url, mode, lang, video_id):
                     transcription_srt=transcription_result['srt'],
                     transcription_vtt=transcription_result['vtt']
                 )
-            
-            # Clean up temporary audio file
-            try:
-                if os.path.exists(audio_file):
-                    os.remove(audio_file)
-                if os.path.exists(temp_dir):
-                    os.rmdir(temp_dir)
-            except:
-                pass  # Don't fail if cleanup fails
         
         if not transcription_result:
             raise Exception("Failed to transcribe audio. Please check your OpenAI API key and try again.")
         
         # Update status to saving files
-        job_statuses[job_id]['status'] = 'saving_files'
-        job_statuses[job_id]['percent'] = 80
+        job['status'] = 'saving_files'
+        job['percent'] = 80
         
         # Create save directory
         save_dir = os.path.join('tmp', job_id)
         os.makedirs(save_dir, exist_ok=True)
         
-        # Save files in different formats
-        txt_path = os.path.join(save_dir, f"{video_id}.txt")
-        srt_path = os.path.join(save_dir, f"{video_id}.srt")
-        vtt_path = os.path.join(save_dir, f"{video_id}.vtt")
-        
-        # Write text file
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['text'])
-        
-        # Write SRT file
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['srt'])
-        
-        # Write VTT file
-        with open(vtt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['vtt'])
-        
-        # Clean up temporary audio file
-        try:
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
-        except:
-            pass  # Don't fail if cleanup fails
+        # Save files in different formats, recording the paths so downloads
+        # don't have to search the job directory
+        job['files'] = save_transcription_formats(save_dir, video_id, transcription_result)
         
         # Update status to complete
-        job_statuses[job_id]['status'] = 'complete'
-        job_statuses[job_id]['percent'] = 100
+        job['status'] = 'complete'
+        job['percent'] = 100
         
         logger.info(f"Completed real transcription for job {job_id}")
         
     except Exception as e:
         logger.error(f"Error in transcription job {job_id}: {e}")
-        job_statuses[job_id]['status'] = 'error'
-        job_statuses[job_id]['error'] = str(e)
-        job_statuses[job_id]['percent'] = 100
+        job['status'] = 'error'
+        job['error'] = str(e)
+        job['percent'] = 100
+    finally:
+        # Clean up downloaded audio, also when the job failed
+        if temp_dir:
+            remove_scratch_dir(temp_dir)
+        with pending_jobs_lock:
+            if pending_jobs.get((video_id, mode, lang)) == job_id:
+                del pending_jobs[(video_id, mode, lang)]
 
-def real_transcribe_file(job_id, file, language, custom_name):
+def real_transcribe_file(job_id, temp_file_path, original_filename, language, custom_name):
     """Real file transcription function using Whisper directly"""
+    temp_dir = os.path.dirname(temp_file_path)
     try:
+        job = job_statuses.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was evicted or never registered, skipping it")
+            return
         logger.info(f"Starting file transcription for job {job_id}")
         
         # Update status to processing
-        job_statuses[job_id]['status'] = 'processing_file'
-        job_statuses[job_id]['percent'] = 10
+        job['status'] = 'processing_file'
+        job['percent'] = 10
         
         # Create save directory
         save_dir = os.path.join('tmp', job_id)
         os.makedirs(save_dir, exist_ok=True)
         
-        # Save uploaded file temporarily
-        temp_dir = tempfile.mkdtemp(dir='tmp')
-        original_filename = file.filename
-        file_ext = os.path.splitext(original_filename)[1].lower()
-        temp_file_path = os.path.join(temp_dir, f"upload{file_ext}")
-        
-        logger.info(f"Saving uploaded file: {original_filename}")
-        file.save(temp_file_path)
-        
         # Update progress
-        job_statuses[job_id]['percent'] = 30
-        job_statuses[job_id]['status'] = 'transcribing_file'
+        job['percent'] = 30
+        job['status'] = 'transcribing_file'
         
         # Transcribe using Whisper directly on the file
         logger.info(f"Transcribing file with Whisper")
@@ -480,62 +573,46 @@ def real_transcribe_file(job_id, file, language, custom_name):
         logger.info(f"File transcription completed successfully")
         
         # Update progress
-        job_statuses[job_id]['percent'] = 80
-        job_statuses[job_id]['status'] = 'saving_results'
+        job['percent'] = 80
+        job['status'] = 'saving_results'
         
         # Save files with custom name or original filename
         base_name = custom_name if custom_name else os.path.splitext(original_filename)[0]
         # Clean base name for safe filename
-        import re
-        base_name = re.sub(r'[<>:"/\\|?*]', '_', base_name)
-        base_name = base_name.strip()
-        
-        # Save transcription files
-        txt_path = os.path.join(save_dir, f"{base_name}.txt")
-        srt_path = os.path.join(save_dir, f"{base_name}.srt")
-        vtt_path = os.path.join(save_dir, f"{base_name}.vtt")
+        base_name = UNSAFE_FILENAME_CHARS_RE.sub('_', base_name).strip()
         
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['text'])
-        
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['srt'])
-        
-        with open(vtt_path, 'w', encoding='utf-8') as f:
-            f.write(transcription_result['vtt'])
-        
-        # Clean up temporary file
-        try:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
-        except:
-            pass  # Don't fail if cleanup fails
+        # Save transcription files, recording the paths so downloads don't
+        # have to search the job directory
+        job['files'] = save_transcription_formats(save_dir, base_name, transcription_result)
         
         # Update status to complete
-        job_statuses[job_id]['status'] = 'complete'
-        job_statuses[job_id]['percent'] = 100
-        job_statuses[job_id]['transcription_file'] = base_name
+        job['status'] = 'complete'
+        job['percent'] = 100
+        job['transcription_file'] = base_name
         
         logger.info(f"Completed file transcription for job {job_id}")
         
     except Exception as e:
         logger.error(f"Error in file transcription job {job_id}: {e}")
-        job_statuses[job_id]['status'] = 'error'
-        job_statuses[job_id]['error'] = str(e)
-        job_statuses[job_id]['percent'] = 100
+        job['status'] = 'error'
+        job['error'] = str(e)
+        job['percent'] = 100
+    finally:
+        # Remove the uploaded file, also when the job failed
+        remove_scratch_dir(temp_dir)
+
+# Single-video URLs: watch, youtu.be short links and embeds
+YOUTUBE_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([0-9A-Za-z_-]{11})'
+)
 
 # === Routes ===
 
 @app.route('/')
 def index():
     """Serve the main page"""
-    return send_from_directory('static', 'index.html')
-
-# API routes must be defined BEFORE the catch-all static files route,
-# otherwise /upload-transcribe, /transcribe, etc. get matched as static file paths
-# and return 405 Method Not Allowed for POST requests.
+    # Always revalidate the page itself so new deployments show up immediately
+    return send_from_directory('static', 'index.html', max_age=0)
 
 @app.route('/transcribe', methods=['POST'])
 def transcribe():
@@ -562,28 +639,23 @@ def transcribe():
         if is_playlist_url(url):
             logger.info(f"Detected playlist URL: {url}")
             
-            # Generate a job ID for playlist
-            job_id = f"playlist_{int(time.time())}_{abs(hash(url)) % 10000}"
+            # Generate a unique job ID for playlist (time/URL-based IDs collide on resubmits)
+            job_id = f"playlist_{uuid.uuid4().hex[:12]}"
             
             logger.info(f"Received playlist transcription request: job_id={job_id}, mode={mode}, lang={lang}")
             
             # Set initial job status for playlist
-            job_statuses[job_id] = {
+            register_job(job_id, {
                 'status': 'queued',
                 'percent': 0,
                 'error': None,
                 'is_playlist': True,
                 'total_videos': 0,
                 'completed_videos': 0
-            }
+            })
             
-            # Start playlist transcription in background thread
-            thread = threading.Thread(
-                target=real_transcribe_playlist,
-                args=(job_id, url, mode, lang),
-                daemon=True
-            )
-            thread.start()
+            # Start playlist transcription in the background
+            job_executor.submit(real_transcribe_playlist, job_id, url, mode, lang)
             
             # Return job ID and playlist info
             response = {
@@ -601,42 +673,34 @@ def transcribe():
         
         # Handle single video URL
         # Validate YouTube URL format
-        import re
-        youtube_patterns = [
-            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([0-9A-Za-z_-]{11})',
-            r'(?:https?://)?(?:www\.)?youtu\.be/([0-9A-Za-z_-]{11})',
-            r'(?:https?://)?(?:www\.)?youtube\.com/embed/([0-9A-Za-z_-]{11})'
-        ]
-        
-        video_id = None
-        for pattern in youtube_patterns:
-            match = re.search(pattern, url)
-            if match:
-                video_id = match.group(1)
-                break
-        
-        if not video_id:
+        match = YOUTUBE_VIDEO_ID_RE.search(url)
+        if not match:
             return jsonify({'error': 'Invalid YouTube URL format'}), 400
-        
-        # Generate a job ID
-        job_id = f"job_{int(time.time())}_{abs(hash(url)) % 10000}"
-        
-        logger.info(f"Received transcription request: job_id={job_id}, video_id={video_id}, mode={mode}, lang={lang}")
-        
-        # Set initial job status
-        job_statuses[job_id] = {
-            'status': 'queued',
-            'percent': 0,
-            'error': None
-        }
-        
-        # Start transcription in background thread
-        thread = threading.Thread(
-            target=real_transcribe_audio,
-            args=(job_id, url, mode, lang, video_id),
-            daemon=True
-        )
-        thread.start()
+        video_id = match.group(1)
+        
+        pending_key = (video_id, mode, lang)
+        with pending_jobs_lock:
+            job_id = pending_jobs.get(pending_key)
+            is_new_job = job_id is None
+            if is_new_job:
+                # Generate a job ID
+                job_id = f"job_{uuid.uuid4().hex[:12]}"
+                # Register the status before publishing the ID, so a duplicate
+                # request never returns a job ID that /status doesn't know yet
+                register_job(job_id, {
+                    'status': 'queued',
+                    'percent': 0,
+                    'error': None
+                })
+                pending_jobs[pending_key] = job_id
+        
+        if is_new_job:
+            logger.info(f"Received transcription request: job_id={job_id}, video_id={video_id}, mode={mode}, lang={lang}")
+            
+            # Start transcription in the background
+            job_executor.submit(real_transcribe_audio, job_id, url, mode, lang, video_id)
+        else:
+            logger.info(f"Reusing in-progress job {job_id} for video_id={video_id}, mode={mode}, lang={lang}")
         
         # Return job ID and video info
         response = {
@@ -696,12 +760,12 @@ def upload_transcribe():
             return jsonify({'error': f'Unsupported file type: {file_ext}'}), 400
         
         # Generate job ID
-        job_id = f"file_{int(time.time())}_{uuid.uuid4().hex[:4]}"
+        job_id = f"file_{uuid.uuid4().hex[:12]}"
         
         logger.info(f"Processing file upload: {file.filename} (size: {file_size}, job: {job_id})")
         
         # Initialize job status
-        job_statuses[job_id] = {
+        register_job(job_id, {
             'status': 'uploading',
             'percent': 0,
             'video_id': custom_name or os.path.splitext(file.filename)[0],
@@ -709,15 +773,17 @@ def upload_transcribe():
             'file_upload': True,
             'original_filename': file.filename,
             'file_size': file_size
-        }
+        })
         
-        # Start transcription in background thread
-        thread = threading.Thread(
-            target=real_transcribe_file,
-            args=(job_id, file, language, custom_name)
-        )
-        thread.daemon = True
-        thread.start()
+        # Save the upload now: the request's file stream is closed once this
+        # handler returns, which may be before a pool worker picks the job up
+        temp_dir = make_scratch_dir(job_id)
+        temp_file_path = os.path.join(temp_dir, f"upload{file_ext}")
+        logger.info(f"Saving uploaded file: {file.filename}")
+        file.save(temp_file_path)
+        
+        # Start transcription in the background
+        job_executor.submit(real_transcribe_file, job_id, temp_file_path, file.filename, language, custom_name)
         
         # Return immediate response
         response = {
@@ -747,8 +813,19 @@ def job_status(job_id):
             'error': 'Job not found'
         })
         
-        logger.info(f"Status check for job {job_id}: {status}")
-        return jsonify(status)
+        # Workers only add keys or change these fields, so they identify the
+        # response well enough for pollers to skip unchanged bodies
+        etag = f"{status.get('status')}-{status.get('percent')}-{status.get('completed_videos', 0)}-{len(status)}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            logger.info(f"Status check for job {job_id}: {status}")
+            response = jsonify(status)
+
+        # A 304 carries the same validators as the full response it stands for
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
         
     except Exception as e:
         logger.error(f"Error checking job status for {job_id}: {e}")
@@ -758,6 +835,13 @@ def job_status(job_id):
             'error': str(e)
         }), 500
 
+# Content types for individual transcription downloads
+DOWNLOAD_CONTENT_TYPES = {
+    'txt': 'text/plain',
+    'srt': 'application/x-subrip',
+    'vtt': 'text/vtt'
+}
+
 @app.route('/download/<job_id>')
 def download(job_id):
     """Download transcription endpoint"""
@@ -767,6 +851,19 @@ def download(job_id):
         # Check if the job is complete
         status = job_statuses.get(job_id)
         
+        # Finished single-video jobs know their file paths, so serve those
+        # directly; the directory is only searched if the status was lost
+        file_path = status.get('files', {}).get(format) if status else None
+        if file_path:
+            logger.info(f"Serving download for job {job_id}, format {format}")
+            return send_file(
+                # Flask resolves relative paths against app.root_path, not the working directory
+                os.path.abspath(file_path),
+                mimetype=DOWNLOAD_CONTENT_TYPES.get(format, 'text/plain'),
+                as_attachment=True,
+                download_name=os.path.basename(file_path)
+            )
+        
         # Check if files exist on disk (even if job status is lost)
         job_dir = os.path.join('tmp', job_id)
         if not os.path.exists(job_dir):
@@ -775,7 +872,6 @@ def download(job_id):
         # Handle ZIP download for playlists
         if format == 'zip':
             import zipfile
-            from io import BytesIO
             
             # If we have files but no job status, assume the job was completed
             if not status:
@@ -783,8 +879,8 @@ def download(job_id):
             elif status.get('status') != 'complete':
                 return f"Playlist transcription is not ready yet. Status: {status.get('status')}", 202
             
-            # Create ZIP file in memory
-            zip_buffer = BytesIO()
+            # Build the ZIP in an anonymous temp file so large playlists aren't held in memory
+            zip_buffer = tempfile.TemporaryFile()
             with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                 # Add all transcription files to the ZIP
                 for filename in os.listdir(job_dir):
@@ -795,16 +891,14 @@ def download(job_id):
             zip_buffer.seek(0)
             
             logger.info(f"Serving ZIP download for playlist job {job_id}")
-            return Response(
-                zip_buffer.getvalue(),
+            return send_file(
+                zip_buffer,
                 mimetype='application/zip',
-                headers={
-                    'Content-Disposition': f'attachment; filename="playlist_transcriptions_{job_id}.zip"'
-                }
+                as_attachment=True,
+                download_name=f"playlist_transcriptions_{job_id}.zip"
             )
         
         # Handle individual file downloads (single videos)
-        # Find the file with the requested format
         files = [f for f in os.listdir(job_dir) if f.endswith(f'.{format}')]
         if not files:
             return f"No {format} file found", 404
@@ -817,34 +911,22 @@ def download(job_id):
         
         file_path = os.path.join(job_dir, files[0])
         
-        # Determine content type based on format
-        content_types = {
-            'txt': 'text/plain',
-            'srt': 'application/x-subrip', 
-            'vtt': 'text/vtt'
-        }
-        
-        content_type = content_types.get(format, 'text/plain')
-        
-        # Read and return the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+        # Stream the file from disk in chunks instead of reading it into memory
         logger.info(f"Serving download for job {job_id}, format {format}")
-        return Response(content, mimetype=content_type, headers={
-            'Content-Disposition': f'attachment; filename="{os.path.basename(file_path)}"'
-        })
+        return send_file(
+            os.path.abspath(file_path),
+            mimetype=DOWNLOAD_CONTENT_TYPES.get(format, 'text/plain'),
+            as_attachment=True,
+            download_name=os.path.basename(file_path)
+        )
         
     except Exception as e:
         logger.error(f"Error in download endpoint for job {job_id}: {e}")
         return f"Error: {e}", 500
 
-@app.route('/<path:filename>')
-def static_files(filename):
-    """Serve static files (must be last - catch-all for non-API paths)"""
-    return send_from_directory('static', filename)
-
 if __name__ == "__main__":
     logger.info("Starting simple YouTube transcription server...")
     logger.info("Access the app at: http://localhost:5050")
-    app.run(host="0.0.0.0", port=5050, debug=True)
+    start_scratch_sweeper()
+    # Debug mode (reloader + interactive debugger) is opt-in via FLASK_DEBUG=1
+    app.run(host="0.0.0.0", port=5050)
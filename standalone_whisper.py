@@ -10,10 +10,16 @@ import subprocess
 import re
 from openai import OpenAI
 
+from proxy_config import ProxyUnreachable, is_proxy_error
+from transcription_files import UNSAFE_FILENAME_CHARS_RE
+
 # OpenAI Whisper API has a 25MB file size limit
 WHISPER_MAX_FILE_SIZE = 25 * 1024 * 1024
 CHUNK_TARGET_SIZE = 20 * 1024 * 1024
 
+# One "id|title|url" line of yt-dlp's --flat-playlist output
+PLAYLIST_ENTRY_RE = re.compile(r'^([^|\n]*)\|([^|\n]*)\|(.*)$', re.MULTILINE)
+
 
 def _get_audio_duration(file_path):
     """Get audio duration in seconds using ffprobe."""
@@ -151,26 +157,16 @@ def extract_playlist_videos(playlist_url, proxy=None, proxy_options=None):
         
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
         
-        videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line and '|' in line:
-                parts = line.split('|', 2)
-                if len(parts) >= 3:
-                    video_id = parts[0]
-                    title = parts[1]
-                    url = parts[2]
-                    
-                    # Clean up title for filename usage
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-                    safe_title = safe_title.strip()
-                    
-                    videos.append({
-                        'id': video_id,
-                        'title': safe_title,
-                        'url': url
-                    })
-        
-        return videos
+        # Parse all entries in one pass over the output instead of line by line
+        return [
+            {
+                'id': video_id,
+                # Clean up title for filename usage
+                'title': UNSAFE_FILENAME_CHARS_RE.sub('_', title).strip(),
+                'url': url
+            }
+            for video_id, title, url in PLAYLIST_ENTRY_RE.findall(result.stdout.strip())
+        ]
         
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr.strip() if e.stderr else str(e)
@@ -186,32 +182,6 @@ def extract_playlist_videos(playlist_url, proxy=None, proxy_options=None):
             raise Exception(f"Failed to extract playlist videos: {error_msg}")
     except Exception as e:
         raise Exception(f"Error extracting playlist: {str(e)}")
-        
-        videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line and '|' in line:
-                parts = line.split('|', 2)
-                if len(parts) >= 3:
-                    video_id = parts[0]
-                    title = parts[1]
-                    url = parts[2]
-                    
-                    # Clean up title for filename usage
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-                    safe_title = safe_title.strip()
-                    
-                    videos.append({
-                        'id': video_id,
-                        'title': safe_title,
-                        'url': url
-                    })
-        
-        return videos
-        
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to extract playlist videos: {e.stderr}")
-    except Exception as e:
-        raise Exception(f"Error extracting playlist: {str(e)}")
 
 def is_playlist_url(url):
     """
@@ -254,8 +224,7 @@ def transcribe_audio_file(file_path, language=None):
                     texts.append(text)
                 transcription_text = "\n\n".join(t.strip() for t in texts if t.strip())
 
-        srt_content = convert_to_srt(transcription_text)
-        vtt_content = convert_to_vtt(transcription_text)
+        srt_content, vtt_content = convert_to_srt_and_vtt(transcription_text)
 
         return {
             "text": transcription_text,
@@ -266,7 +235,7 @@ def transcribe_audio_file(file_path, language=None):
         print(f"Error transcribing audio: {e}")
         return None
 
-def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options=None):
+def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options=None, socket_timeout=30):
     """
     Download audio from a YouTube video using yt-dlp.
     
@@ -275,9 +244,13 @@ def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options
         output_path (str, optional): Output directory
         proxy (str, optional): Proxy URL (e.g., 'http://proxy:port' or 'socks5://proxy:port')
         proxy_options (list, optional): Additional yt-dlp options for advanced proxy handling
+        socket_timeout (float, optional): Seconds yt-dlp waits on a stalled connection
         
     Returns:
         str: Path to downloaded audio file
+        
+    Raises:
+        ProxyUnreachable: If the download failed because the proxy could not be used
     """
     try:
         # Create a temporary directory if no output path provided
@@ -299,7 +272,7 @@ def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options
             "--no-playlist",
             "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "--extractor-retries", "3",
-            "--socket-timeout", "30",
+            "--socket-timeout", str(socket_timeout),
             "--sleep-interval", "1",
             "--max-sleep-interval", "3"
         ]
@@ -319,6 +292,10 @@ def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options
         if result.returncode != 0:
             error_msg = result.stderr.strip() if result.stderr else "Unknown error"
             
+            # Let callers rotating through proxies move on to the next one
+            if (proxy or proxy_options) and is_proxy_error(error_msg):
+                raise ProxyUnreachable(error_msg)
+            
             # Check for specific YouTube errors
             if "private" in error_msg.lower():
                 raise Exception(f"Video is private or unavailable.")
@@ -335,10 +312,51 @@ def download_audio_from_youtube(url, output_path=None, proxy=None, proxy_options
                 return os.path.join(output_dir, file)
         
         raise Exception("No audio file found after download")
+    except ProxyUnreachable:
+        raise
     except Exception as e:
         print(f"Error downloading audio: {e}")
         return None
 
+def _split_into_chunks(text, words_per_chunk=10):
+    """Split text into subtitle chunks of ~words_per_chunk words."""
+    words = text.split()
+    return [
+        " ".join(words[i:i + words_per_chunk])
+        for i in range(0, len(words), words_per_chunk)
+    ]
+
+
+def convert_to_srt_and_vtt(text, chunk_duration=5):
+    """
+    Convert plain text to SRT and WebVTT formats in a single pass.
+
+    Args:
+        text (str): Plain text transcription
+        chunk_duration (int): Duration of each subtitle chunk in seconds
+
+    Returns:
+        tuple: (SRT formatted text, WebVTT formatted text)
+    """
+    srt_parts = []
+    vtt_parts = ["WEBVTT\n\n"]
+
+    # Each cue starts where the previous one ended, so every boundary is formatted once
+    start_srt = format_time_srt(0)
+    start_vtt = format_time_vtt(0)
+    for i, chunk in enumerate(_split_into_chunks(text)):
+        end_time = (i + 1) * chunk_duration
+        end_srt = format_time_srt(end_time)
+        end_vtt = format_time_vtt(end_time)
+
+        srt_parts.append(f"{i + 1}\n{start_srt} --> {end_srt}\n{chunk}\n\n")
+        vtt_parts.append(f"{start_vtt} --> {end_vtt}\n{chunk}\n\n")
+
+        start_srt, start_vtt = end_srt, end_vtt
+
+    return "".join(srt_parts), "".join(vtt_parts)
+
+
 def convert_to_srt(text, chunk_duration=5):
     """
     Convert plain text to SRT format.
@@ -350,33 +368,8 @@ def convert_to_srt(text, chunk_duration=5):
     Returns:
         str: SRT formatted text
     """
-    # Split text into chunks (simple implementation)
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    
-    for word in words:
-        current_chunk.append(word)
-        if len(current_chunk) >= 10:  # ~10 words per chunk
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    
-    # Generate SRT
-    srt = ""
-    for i, chunk in enumerate(chunks):
-        start_time = i * chunk_duration
-        end_time = (i + 1) * chunk_duration
-        
-        # Format start and end times (HH:MM:SS,mmm)
-        start_formatted = format_time_srt(start_time)
-        end_formatted = format_time_srt(end_time)
-        
-        srt += f"{i + 1}\n{start_formatted} --> {end_formatted}\n{chunk}\n\n"
-    
-    return srt
+    return convert_to_srt_and_vtt(text, chunk_duration)[0]
+
 
 def convert_to_vtt(text, chunk_duration=5):
     """
@@ -389,35 +382,8 @@ def convert_to_vtt(text, chunk_duration=5):
     Returns:
         str: WebVTT formatted text
     """
-    # Start with WebVTT header
-    vtt = "WEBVTT\n\n"
-    
-    # Split text into chunks (simple implementation)
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    
-    for word in words:
-        current_chunk.append(word)
-        if len(current_chunk) >= 10:  # ~10 words per chunk
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    
-    # Generate VTT cues
-    for i, chunk in enumerate(chunks):
-        start_time = i * chunk_duration
-        end_time = (i + 1) * chunk_duration
-        
-        # Format start and end times (HH:MM:SS.mmm)
-        start_formatted = format_time_vtt(start_time)
-        end_formatted = format_time_vtt(end_time)
-        
-        vtt += f"{start_formatted} --> {end_formatted}\n{chunk}\n\n"
-    
-    return vtt
+    return convert_to_srt_and_vtt(text, chunk_duration)[1]
+
 
 def format_time_srt(seconds):
     """Format seconds to SRT timestamp (HH:MM:SS,mmm)"""
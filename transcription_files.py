@@ -0,0 +1,36 @@
+"""
+File helpers shared by the Flask server scripts.
+
+Nothing here imports from the app package, so simple_server and
+standalone_whisper can use it without loading the FastAPI application.
+"""
+import os
+import re
+
+# Characters not allowed in file names on common filesystems
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+
+# Transcription keys written for each output file extension
+TRANSCRIPTION_FORMATS = {'txt': 'text', 'srt': 'srt', 'vtt': 'vtt'}
+
+
+def save_transcription_formats(directory, base_name, transcription):
+    """
+    Save a transcription as .txt, .srt and .vtt files.
+    
+    Args:
+        directory (str): Existing directory to write into
+        base_name (str): File name without extension
+        transcription (dict): Transcription data with text, srt, and vtt formats
+        
+    Returns:
+        dict: File paths by format
+    """
+    files = {}
+    for ext, key in TRANSCRIPTION_FORMATS.items():
+        path = os.path.join(directory, f"{base_name}.{ext}")
+        # Encode once and write the bytes straight through, skipping the text-mode encoder
+        with open(path, 'wb') as f:
+            f.write(transcription[key].encode('utf-8'))
+        files[ext] = path
+    return files